@@ -38,6 +38,7 @@ __all__ = ['base_classes',
            'nmr_star_dict_v3_1']
 
 # Python module imports.
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from os import F_OK, access
 from re import search
 import sys
@@ -45,10 +46,11 @@ import sys
 # Bmrblib module imports.
 from bmrblib.nmr_star_dict_v2_1 import NMR_STAR_v2_1
 from bmrblib.nmr_star_dict_v3_1 import NMR_STAR_v3_1
+from bmrblib.pystarlib.ParseCache import ParseCache
 from bmrblib.version import Star_version
 
 
-def create_nmr_star(title, file_path, version=None):
+def create_nmr_star(title, file_path, version=None, cache=None):
     """Initialise the NMR-STAR object.
 
     @param title:       The title of the NMR-STAR data.
@@ -57,6 +59,8 @@ def create_nmr_star(title, file_path, version=None):
     @type file_path:    str
     @keyword version:   The NMR-STAR version to use.
     @type version:      str
+    @keyword cache:     The cache of parsed files, or the directory of the cache, used when reading the file.  If None, the file is always parsed.  The cache entries are pickles which can run code when loaded, so the cache directory must not be writable by untrusted users.  A new directory is made accessible to its owner only, and entries of other users are not loaded.
+    @type cache:        None, str or pystarlib ParseCache instance
     @return:            The NMR-STAR python object.
     @rtype:             class instance
     """
@@ -69,18 +73,21 @@ def create_nmr_star(title, file_path, version=None):
     if not version:
         version = '3.1'
 
-    # Store the version in the singleton.
-    star_version = Star_version()
-    star_version.set_version(version)
+    # The version information.
+    star_version = Star_version(version)
 
     # Print out.
     sys.stdout.write("NMR-STAR version %s\n" % star_version.version)
 
+    # The parse cache.
+    if isinstance(cache, str):
+        cache = ParseCache(directory=cache)
+
     # Initialise the NMR-STAR data object.
     if star_version.major == 3:
-        star = NMR_STAR_v3_1('relax_model_free_results', file_path)
+        star = NMR_STAR_v3_1('relax_model_free_results', file_path, version=version, cache=cache)
     elif star_version.major == 2:
-        star = NMR_STAR_v2_1('relax_model_free_results', file_path)
+        star = NMR_STAR_v2_1('relax_model_free_results', file_path, version=version, cache=cache)
     else:
         raise NameError("The NMR-STAR version %s is unknown." % star_version.version)
 
@@ -91,23 +98,133 @@ def create_nmr_star(title, file_path, version=None):
 def determine_version(file_path):
     """Determine the version of the given NMR-STAR file.
 
-    @param file_path:   The full file path.
-    @type file_path:    str
+    The file is read line by line, stopping at the version line, so normally only the header of the file is read.
+
+    @param file_path:   The full file path, or an already open file object or memory map.  An open file is read from its current position.
+    @type file_path:    str or file object
     @return:            The NMR-STAR version number.
     @rtype:             str
     """
 
-    # Read the file.
-    file = open(file_path)
-    lines = file.readlines()
-    file.close()
-
-    # Loop over the lines of the file.
-    for line in lines:
-        # Find the version line.
-        if search('\.NMR_STAR_version', line) or search('_NMR_STAR_version', line):
+    # Open the file.
+    if isinstance(file_path, str):
+        file = open(file_path)
+        try:
+            return determine_version(file)
+        finally:
+            file.close()
+
+    # Loop over the lines of the file, up to the empty string or bytes of the end of the file.
+    for line in iter(file_path.readline, file_path.read(0)):
+        # Bytes from binary files or memory maps.
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', 'replace')
+
+        # Find the version line (the '_Entry.NMR_STAR_version' or '_NMR_STAR_version' tag).
+        if search(r'[._]NMR_STAR_version', line):
             # Split the line.
             row = line.split()
 
             # Return the version number.
             return row[1]
+
+
+def read_entries(file_paths, saveframes, version=None, categories=None, typed=True, cache=None):
+    """Read the NMR-STAR files and return the data of the given saveframes.
+
+    This is the worker function of read_many(), which runs in the worker processes.
+
+    @param file_paths:  The full file paths.
+    @type file_paths:   list of str
+    @param saveframes:  The names of the saveframe API objects to loop over, e.g. ['model_free', 'relaxation'].
+    @type saveframes:   list of str
+    @keyword version:   The NMR-STAR version of the files.  If None, it is determined for each file.
+    @type version:      None or str
+    @keyword categories:    The saveframe categories to parse.  See NMR_STAR.read().
+    @type categories:       None or list of str
+    @keyword typed:     A flag which if True will return the looped int and float data as NumPy arrays.
+    @type typed:        bool
+    @keyword cache:     The cache of parsed files.  See create_nmr_star().
+    @type cache:        None, str or pystarlib ParseCache instance
+    @return:            The file path and the dictionary of the list of saveframe data for each saveframe API name, for each file.
+    @rtype:             list of (str, dict)
+    """
+
+    # Init.
+    results = []
+
+    # Loop over the files.
+    for file_path in file_paths:
+        # Read the file.
+        star = create_nmr_star('read_many', file_path, version=version, cache=cache)
+        star.read(categories=categories)
+
+        # Collect the data of the saveframes (skipping the None of missing saveframes).
+        data = {}
+        for name in saveframes:
+            data[name] = [sf_data for sf_data in getattr(star, name).loop(typed=typed) if sf_data != None]
+
+        # Store the data.
+        results.append((file_path, data))
+
+    # Return the results.
+    return results
+
+
+def read_many(file_paths, saveframes, workers=None, ordered=True, chunksize=1, version=None, categories=None, typed=True, cache=None):
+    """Read many NMR-STAR files in a process pool, yielding the data of the given saveframes.
+
+    Each worker process parses its files and only returns the data of the given saveframe API objects, as looped over by their loop() methods, and not the pystarlib data nodes.
+
+    @param file_paths:      The full file paths.
+    @type file_paths:       list of str
+    @param saveframes:      The names of the saveframe API objects to loop over, e.g. ['model_free', 'relaxation'].
+    @type saveframes:       list of str
+    @keyword workers:       The number of worker processes.  If None, the number of CPUs is used.
+    @type workers:          None or int
+    @keyword ordered:       A flag which if True will yield the results in the order of the file paths.  Otherwise the results are yielded as soon as they are ready.
+    @type ordered:          bool
+    @keyword chunksize:     The number of files sent to a worker process per task.
+    @type chunksize:        int
+    @keyword version:       The NMR-STAR version of the files.  If None, it is determined for each file.
+    @type version:          None or str
+    @keyword categories:    The saveframe categories to parse.  See NMR_STAR.read().
+    @type categories:       None or list of str
+    @keyword typed:         A flag which if True will return the looped int and float data as NumPy arrays.
+    @type typed:            bool
+    @keyword cache:         The cache of parsed files, shared by the worker processes.  See create_nmr_star().
+    @type cache:            None, str or pystarlib ParseCache instance
+    @return:                The file path and the dictionary of the list of saveframe data for each saveframe API name, for each file.
+    @rtype:                 generator of (str, dict)
+    """
+
+    # Check the arguments.
+    if chunksize < 1:
+        raise NameError("The chunk size of %s must be at least 1." % chunksize)
+
+    # Split the files into the tasks.
+    file_paths = list(file_paths)
+    chunks = []
+    for i in range(0, len(file_paths), chunksize):
+        chunks.append(file_paths[i:i+chunksize])
+
+    # The process pool.
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        # Submit all tasks.
+        futures = []
+        for chunk in chunks:
+            futures.append(executor.submit(read_entries, chunk, saveframes, version=version, categories=categories, typed=typed, cache=cache))
+
+        # The order of the results.
+        if not ordered:
+            futures = as_completed(futures)
+
+        # Yield the results.
+        for future in futures:
+            for result in future.result():
+                yield result
+
+    # Shut down the pool, cancelling the remaining tasks if not all results were used.
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -26,35 +26,39 @@ This file is part of the U{BMRB library<https://gna.org/projects/bmrblib>}.
 """
 
 # Python module imports.
-from numpy import float64, ndarray, zeros
+from numpy import ndarray
 from warnings import warn
 
 # Bmrblib module imports.
-from bmrblib.misc import no_missing, translate
-from bmrblib.pystarlib.SaveFrame import SaveFrame
+from bmrblib.misc import no_missing, translate, translate_array
+from bmrblib.pystarlib.File import DataNodeList
+from bmrblib.pystarlib.SaveFrame import SaveFrame, possibleTagNamesSFCategory
 from bmrblib.pystarlib.TagTable import TagTable
-from bmrblib.version import Star_version; version = Star_version()
 
 
 class BaseSaveframe:
     """The base class for the saveframe classes."""
 
-    def __init__(self, datanodes):
+    def __init__(self, datanodes, star_version=None):
         """Initialise the class, placing the pystarlib data nodes into the namespace.
 
-        @param datanodes:   The pystarlib data nodes object.
-        @type datanodes:    list
+        @param datanodes:       The pystarlib data nodes object.
+        @type datanodes:        list
+        @keyword star_version:  The NMR-STAR version information of the data nodes.
+        @type star_version:     None or Star_version instance
         """
 
-        # Place the data nodes into the namespace.
+        # Place the data nodes and version into the namespace.
         self.datanodes = datanodes
+        self.star_version = star_version
 
         # The saveframe counter.
         self.count = 0
 
-        # Add the specific tag category objects.
+        # Add the specific tag category objects, copied from the frozen tag schema of the class.
         self.tag_categories = CategoryList()
-        self.add_tag_categories()
+        for cat in self.tag_schema():
+            self.tag_categories.append(cat.clone(self))
 
 
     def add(self, **keywords):
@@ -66,65 +70,139 @@ class BaseSaveframe:
         @rtype:     int
         """
 
-        # Reset all data structures.
-        self.reset()
+        # Check and translate the keyword arguments.
+        tags, defaults = self.compile_tags()
+        values = self.translate_keywords(keywords, tags)
 
-        # First set default values.
-        for cat in self.tag_categories:
+        # Set up the tag information.
+        for i in range(len(self.tag_categories)):
+            self.tag_categories[i].tag_setup()
+
+        # Create the saveframe and add it to the data nodes.
+        self.create_frame(defaults, values)
+        self.datanodes.append(self.frame)
+
+        # Return the saveframe count.
+        return self.count
+
+
+    def add_many(self, records):
+        """Add the data of many saveframes at once.
+
+        Each record is a dictionary of the keyword arguments of add().  All records are checked and translated before the first saveframe is created, and the saveframes are then appended to the data nodes together.
+
+        @param records: The keyword arguments of each saveframe.
+        @type records:  list of dict
+        @return:        The saveframe counts.
+        @rtype:         list of int
+        """
+
+        # The tag metadata.
+        tags, defaults = self.compile_tags()
+
+        # Check and translate all records.
+        translated = []
+        for keywords in records:
+            translated.append(self.translate_keywords(keywords, tags))
+
+        # Set up the tag information.
+        for i in range(len(self.tag_categories)):
+            self.tag_categories[i].tag_setup()
+
+        # Loop over the records.
+        frames = []
+        counts = []
+        for values in translated:
+            # Create the saveframe.
+            self.create_frame(defaults, values)
+
+            # Store the saveframe and count.
+            frames.append(self.frame)
+            counts.append(self.count)
+
+        # Add the saveframes to the data nodes.
+        self.datanodes.extend(frames)
+
+        # Return the saveframe counts.
+        return counts
+
+
+    @classmethod
+    def compile_tags(cls):
+        """Return the tag metadata used for adding data.
+
+        The metadata is compiled once per class from the frozen tag schema (see tag_schema()).
+
+        @return:    The tag information for each variable name as (category index, key, tag object, allowed values) tuples, and the (variable name, translated default) pairs.
+        @rtype:     dict, tuple of tuple
+        """
+
+        # Already compiled.
+        if '_tag_metadata' in cls.__dict__:
+            return cls._tag_metadata
+
+        # Init.
+        tags = {}
+        defaults = []
+        tag_categories = CategoryList(cls.tag_schema())
+
+        # Loop over the tag categories.
+        for cat in tag_categories:
             # Loop over the keys.
             for key in cat._key_list:
-                # No variable or no default value.
-                if not cat[key].var_name or not cat[key].default:
+                obj = cat[key]
+
+                # No variable.
+                if not obj.var_name:
                     continue
 
-                # Set the default.
-                setattr(self, cat[key].var_name, translate(cat[key].default))
+                # The default value.
+                if obj.default:
+                    defaults.append((obj.var_name, translate(obj.default)))
 
-        # Loop over the keywords.
-        for name, val in keywords.items():
-            # Get the tag object.
-            info = self.tag_categories.get_tag(name)
+                # Already compiled.
+                if obj.var_name in tags:
+                    continue
 
-            # No corresponding tag, so set as a class instance variable and move to the next keyword.
-            if not info:
-                setattr(self, name, val)
-                continue
+                # The tag object used for the variable name.
+                cat_index, tag_key, tag_obj = tag_categories.get_tag(obj.var_name)
 
-            # Unpack.
-            cat_index, key, obj = info
+                # The allowed values as a set, if possible.
+                allowed = tag_obj.allowed
+                if allowed != None:
+                    try:
+                        allowed = frozenset(allowed)
+                    except TypeError:
+                        pass
 
-            # Check that a value has been supplied.
-            if not obj.missing:
-                no_missing(val, name)
+                # Store the info.
+                tags[obj.var_name] = (cat_index, tag_key, tag_obj, allowed)
 
-            # Check that the value is allowed.
-            if obj.allowed != None:
-                # List argument.
-                if not (isinstance(val, list) and not isinstance(val, ndarray)):
-                    val_list = [val]
-                else:
-                    val_list = val
+        # Store and return the metadata.
+        cls._tag_metadata = (tags, tuple(defaults))
+        return cls._tag_metadata
 
-                # Loop over the list.
-                for i in range(len(val_list)):
-                    if val_list[i] not in obj.allowed:
-                        raise NameError("The %s keyword argument of '%s' must be one of %s." % (name, val_list[i], obj.allowed))
 
-            # Length check of the non-free tag category elements (must be the same).
-            if (isinstance(val, list) or isinstance(val, ndarray)):
-                # Get the reference length.
-                N = self.tag_categories[cat_index]._N()
+    def create_frame(self, defaults, values):
+        """Create the saveframe from the translated values, storing it as the frame variable.
 
-                # No length yet.
-                if N == None:
-                    pass
+        @param defaults:    The (variable name, value) pairs of the default values from compile_tags().
+        @type defaults:     tuple of tuple
+        @param values:      The (variable name, value) pairs from translate_keywords().
+        @type values:       list of tuple
+        """
 
-                # Mismatch.
-                if N != None and len(val) != N:
-                    raise NameError("The number of elements in the %s keyword argument should be N = %s." % (name, N))
+        # Reset all data structures.
+        self.reset()
 
-            # Store the argument.
-            setattr(self, name, translate(val))
+        # First set default values, then the keyword values.
+        for name, val in defaults + tuple(values):
+            # Copy lists, as these end up in the tagtables.
+            if isinstance(val, list):
+                val = val[:]
+
+            # Store the value.
+            setattr(self, name, val)
 
         # Saveframe counter updating.
         self.count = self.count + 1
@@ -144,13 +222,7 @@ class BaseSaveframe:
 
         # Create the tag categories.
         for i in range(len(self.tag_categories)):
-            self.tag_categories[i].create()
-
-        # Add the saveframe to the data nodes.
-        self.datanodes.append(self.frame)
-
-        # Return the saveframe count.
-        return self.count
+            self.tag_categories[i].create(setup=False)
 
 
     def create_title(self):
@@ -167,11 +239,13 @@ class BaseSaveframe:
             return self.sf_label + '_' + self.count_str
 
 
-    def extract_data(self, datanode):
+    def extract_data(self, datanode, typed=False):
         """Read all the tags from the datanodes.
 
         @keyword datanode:  The datanode.
         @type datanode:     Datanode instance
+        @keyword typed:     A flag which if True will convert the looped int and float tag data into NumPy arrays.
+        @type typed:        bool
         @return:            The data.
         @rtype:             tuple
         """
@@ -186,10 +260,10 @@ class BaseSaveframe:
                 continue
 
             # Extract the data.
-            self.tag_categories[mapping[i]].extract_tag_data(datanode.tagtables[i])
+            self.tag_categories[mapping[i]].extract_tag_data(datanode.tagtables[i], typed=typed)
 
         # Add the framecode for v2.1 files.
-        if version.major == 2:
+        if self.star_version != None and self.star_version.major == 2:
             self.sf_framecode = datanode.title
 
 
@@ -204,40 +278,35 @@ class BaseSaveframe:
 
         # Init.
         N = len(self.tag_categories)
-        M = len(datanode.tagtables)
-        counts = zeros((M, N), float64)
         mapping = []
 
-        # Count the tag name matches.
-        for table_ind in range(M):
-            for cat_ind in range(N):
-                # Alias.
-                cat = self.tag_categories[cat_ind]
-                table = datanode.tagtables[table_ind]
-
-                # Loop over the tags.
-                for key in cat.keys():
-                    for name in table.tagnames:
-                        # Check for a match.
-                        if name == cat[key].tag_name_full():
-                            counts[table_ind, cat_ind] += 1
-
-            # The index of the maximum count.
-            if not counts[table_ind].sum():
+        # Loop over the tagtables.
+        for table in datanode.tagtables:
+            # Count the tag name matches for each tag category.
+            counts = [0] * N
+            for name in table.tagnames:
+                for cat_ind, key in self.tag_categories.tag_positions(name):
+                    counts[cat_ind] += 1
+
+            # The index of the first maximum count.
+            max_count = max(counts, default=0)
+            if not max_count:
                 index = None
             else:
-                index = counts[table_ind].tolist().index(counts[table_ind].max())
+                index = counts.index(max_count)
             mapping.append(index)
 
         # Return the mapping.
         return mapping
 
 
-    def loop(self):
+    def loop(self, typed=False):
         """Loop over the saveframes, yielding the data.
 
-        @return:    The saveframe data.
-        @rtype:     tuple
+        @keyword typed: A flag which if True will return the looped int and float data as NumPy arrays (float64 with NaN or masked int64 arrays for the missing values) rather than lists.
+        @type typed:    bool
+        @return:        The saveframe data.
+        @rtype:         tuple
         """
 
         # Set up the tag information.
@@ -247,27 +316,47 @@ class BaseSaveframe:
         # Get the saveframe name.
         sf_name = getattr(self, 'sf_label')
 
+        # Loop over the matching datanodes.
+        for datanode in self.find_saveframes(sf_name):
+            # Extract the information.
+            self.extract_data(datanode, typed=typed)
+
+            # Return the saveframe info.
+            yield self.read()
+
+
+    def find_saveframes(self, sf_name):
+        """Return the datanodes whose SfCategory tag has the given value.
+
+        The category index of the datanode list is used when available, otherwise all datanodes are scanned.
+
+        @param sf_name: The saveframe category.
+        @type sf_name:  str
+        @return:        The matching datanodes, in the order of the file.
+        @rtype:         list of SaveFrame instances
+        """
+
+        # The full SfCategory tag name.
+        tag_name = self.tag_categories[0]['SfCategory'].tag_name_full()
+
+        # Jump to the saveframes via the category index.
+        if isinstance(self.datanodes, DataNodeList) and tag_name.endswith(possibleTagNamesSFCategory):
+            return self.datanodes.category_datanodes(tag_name, sf_name)
+
         # Loop over all datanodes.
+        datanodes = []
         for datanode in self.datanodes:
             # Find the saveframes via the SfCategory tag index.
-            found = False
             for index in range(len(datanode.tagtables[0].tagnames)):
                 # First match the tag names.
-                if datanode.tagtables[0].tagnames[index] == self.tag_categories[0]['SfCategory'].tag_name_full():
+                if datanode.tagtables[0].tagnames[index] == tag_name:
                     # Then the tag value.
                     if datanode.tagtables[0].tagvalues[index][0] == sf_name:
-                        found = True
+                        datanodes.append(datanode)
                         break
 
-            # Skip the datanode.
-            if not found:
-                continue
-
-            # Extract the information.
-            self.extract_data(datanode)
-
-            # Return the saveframe info.
-            yield self.read()
+        # Return the matches.
+        return datanodes
 
 
     def pre_ops(self):
@@ -300,8 +389,13 @@ class BaseSaveframe:
                 else:
                     obj = getattr(self, cat[key].var_name)
 
+                # Typed data is already converted.
+                if isinstance(obj, ndarray):
+                    data[cat[key].var_name] = obj
+
                 # Package the translated data.
-                data[cat[key].var_name] = translate(obj, format=cat[key].format, reverse=True)
+                else:
+                    data[cat[key].var_name] = translate(obj, format=cat[key].format, reverse=True)
 
         # Return the data.
         return data
@@ -326,6 +420,100 @@ class BaseSaveframe:
                 setattr(self, cat[key].var_name, translate(None))
 
 
+    @classmethod
+    def tag_schema(cls):
+        """Return the frozen tag categories of the saveframe class.
+
+        The tag categories are built by add_tag_categories() on a bare instance of the class the first time, and their tag objects are frozen.  These are shared by all instances of the class, which hold copies of the tag categories with their own data.
+
+        @return:    The frozen tag categories.
+        @rtype:     tuple of TagCategory instances
+        """
+
+        # Build the schema once per class.
+        if '_tag_schema' not in cls.__dict__:
+            # A bare instance holding no data.
+            sf = cls.__new__(cls)
+            sf.tag_categories = CategoryList()
+            sf.add_tag_categories()
+
+            # Set up and freeze the tag categories.
+            for cat in sf.tag_categories:
+                cat.tag_setup()
+                cat.freeze()
+
+            # Store the schema.
+            cls._tag_schema = tuple(sf.tag_categories)
+
+        # Return the schema.
+        return cls._tag_schema
+
+
+    def translate_keywords(self, keywords, tags):
+        """Check and translate the keyword arguments of a saveframe.
+
+        @param keywords:    The keyword arguments of add().
+        @type keywords:     dict
+        @param tags:        The tag information from compile_tags().
+        @type tags:         dict
+        @return:            The list of (variable name, value) pairs to set.
+        @rtype:             list of tuple
+        """
+
+        # Init.
+        values = []
+        lengths = {}
+
+        # Loop over the keywords.
+        for name, val in keywords.items():
+            # Get the tag information.
+            info = tags.get(name)
+
+            # No corresponding tag, so set as a class instance variable and move to the next keyword.
+            if not info:
+                values.append((name, val))
+                continue
+
+            # Unpack.
+            cat_index, key, obj, allowed = info
+
+            # Check that a value has been supplied.
+            if not obj.missing:
+                no_missing(val, name)
+
+            # Check that the value is allowed.
+            if allowed != None:
+                # List argument.
+                if not (isinstance(val, list) and not isinstance(val, ndarray)):
+                    val_list = [val]
+                else:
+                    val_list = val
+
+                # Loop over the list.
+                for i in range(len(val_list)):
+                    try:
+                        found = val_list[i] in allowed
+                    except TypeError:
+                        found = val_list[i] in obj.allowed
+                    if not found:
+                        raise NameError("The %s keyword argument of '%s' must be one of %s." % (name, val_list[i], obj.allowed))
+
+            # Length check of the non-free tag category elements (must be the same).
+            if (isinstance(val, list) or isinstance(val, ndarray)):
+                # Get the reference length.
+                N = lengths.setdefault(cat_index, len(val))
+
+                # Mismatch.
+                if len(val) != N:
+                    raise NameError("The number of elements in the %s keyword argument should be N = %s." % (name, N))
+
+            # Store the translated argument.
+            values.append((name, translate(val)))
+
+        # Return the values.
+        return values
+
+
 class MissingSaveframe:
     """Special class for when BMRB saveframes are non-existent in certain NMR-STAR versions."""
 
@@ -347,7 +535,7 @@ class MissingSaveframe:
         warn(Warning("The %s saveframe does not exist in this NMR-STAR version." % self.name))
 
 
-    def loop(self):
+    def loop(self, typed=False):
         """Special function for giving a warning."""
 
         # The warning.
@@ -360,23 +548,179 @@ class MissingSaveframe:
 
 
 class CategoryList(list):
-    """A special lits object for holding the different saveframe tag categories."""
+    """A special lits object for holding the different saveframe tag categories.
 
-    def get_tag(self, var_name):
-        """Return the tag object possessing the given variable name.
+    The variable names of the tag objects of all categories are indexed for get_tag() and their full tag names for tag_positions().  The indices are built on the first lookup and are reset by any change to the list, to the tag prefixes of its categories or to the variable or tag names of their tag objects.
+    """
 
-        @param var_name:    The variable name.
-        @type var_name:     str
-        @return:            The key and tag objects.
-        @rtype:             str, TagObject instance
+    def __init__(self, *args):
+        """Initialise the list and the indices."""
+
+        # Initialise the baseclass.
+        super(CategoryList, self).__init__(*args)
+
+        # The indices.
+        self.index_reset()
+
+
+    def build_index(self):
+        """Build the index of the variable names of all tag objects."""
+
+        # Init.
+        self.var_index = {}
+
+        # Loop over the categories.
+        for i in range(len(self)):
+            # Link the category to this list, for resetting the index.
+            self[i].category_list = self
+
+            # Loop over the keys, keeping the first match.
+            for key, obj in self[i].items():
+                self.var_index.setdefault(obj.var_name, (i, key, obj))
+
+
+    def build_tag_index(self):
+        """Build the index of the full tag names of all tag objects.
+
+        The index maps each full tag name to a tuple of (category index, key) pairs.
         """
 
+        # Init.
+        index = {}
+
         # Loop over the categories.
         for i in range(len(self)):
+            # Link the category to this list, for resetting the index.
+            self[i].category_list = self
+
             # Loop over the keys.
             for key, obj in self[i].items():
-                if var_name == obj.var_name:
-                    return i, key, obj
+                # The full tag name.
+                name = obj.tag_name_full()
+                if name == None:
+                    continue
+
+                # Store the position.
+                index.setdefault(name, []).append((i, key))
+
+        # Freeze and store the index.
+        self.tag_index = {}
+        for name in index:
+            self.tag_index[name] = tuple(index[name])
+
+
+    def get_tag(self, var_name):
+        """Return the tag object possessing the given variable name.
+
+        @param var_name:    The variable name.
+        @type var_name:     str
+        @return:            The category index, key and tag object.
+        @rtype:             int, str, TagObject instance
+        """
+
+        # Build the index, if needed.
+        if self.var_index == None:
+            self.build_index()
+
+        # Return the tag info.
+        return self.var_index.get(var_name)
+
+
+    def index_reset(self):
+        """Reset the indices, so that they are rebuilt at the next lookup."""
+
+        # Reset.
+        self.var_index = None
+        self.tag_index = None
+
+
+    def tag_positions(self, tag_name):
+        """Return the positions of the tag objects possessing the given full tag name.
+
+        @param tag_name:    The full tag name.
+        @type tag_name:     str
+        @return:            The (category index, key) pairs.
+        @rtype:             tuple of tuple
+        """
+
+        # Build the index, if needed.
+        if self.tag_index == None:
+            self.build_tag_index()
+
+        # Return the positions.
+        return self.tag_index.get(tag_name, ())
+
+
+    def __setitem__(self, *args):
+        """Set an item, resetting the index."""
+        self.index_reset()
+        return super(CategoryList, self).__setitem__(*args)
+
+
+    def __delitem__(self, *args):
+        """Delete an item, resetting the index."""
+        self.index_reset()
+        return super(CategoryList, self).__delitem__(*args)
+
+
+    def __iadd__(self, *args):
+        """Extend the list in place, resetting the index."""
+        self.index_reset()
+        return super(CategoryList, self).__iadd__(*args)
+
+
+    def __imul__(self, *args):
+        """Repeat the list in place, resetting the index."""
+        self.index_reset()
+        return super(CategoryList, self).__imul__(*args)
+
+
+    def append(self, *args):
+        """Append a category, resetting the index."""
+        self.index_reset()
+        return super(CategoryList, self).append(*args)
+
+
+    def clear(self):
+        """Empty the list, resetting the index."""
+        self.index_reset()
+        return super(CategoryList, self).clear()
+
+
+    def extend(self, *args):
+        """Extend the list, resetting the index."""
+        self.index_reset()
+        return super(CategoryList, self).extend(*args)
+
+
+    def insert(self, *args):
+        """Insert a category, resetting the index."""
+        self.index_reset()
+        return super(CategoryList, self).insert(*args)
+
+
+    def pop(self, *args):
+        """Remove and return a category, resetting the index."""
+        self.index_reset()
+        return super(CategoryList, self).pop(*args)
+
+
+    def remove(self, *args):
+        """Remove a category, resetting the index."""
+        self.index_reset()
+        return super(CategoryList, self).remove(*args)
+
+
+    def reverse(self):
+        """Reverse the list, resetting the index."""
+        self.index_reset()
+        return super(CategoryList, self).reverse()
+
+
+    def sort(self, *args, **kwargs):
+        """Sort the list, resetting the index."""
+        self.index_reset()
+        return super(CategoryList, self).sort(*args, **kwargs)
 
 
 
@@ -395,10 +739,15 @@ class TagTranslationTable(dict):
         # The key ordering.
         self._key_list = []
 
+        # The CategoryList holding this table, once indexed there.
+        self.category_list = None
+
 
     def add(self, key, var_name=None, tag_name=None, allowed=None, default=None, format='str', missing=True):
         """Add an entry to the translation table.
 
+        Re-adding the key of a frozen tag object is not allowed.
+
         @keyword key:       The dictionary key.  This is also the BMRB NMR-STAR database table name.
         @type key:          str
         @keyword var_name:  The saveframe variable name corresponding to the key.
@@ -429,6 +778,9 @@ class TagTranslationTable(dict):
             self._key_list.remove(key)
             self._key_list.append(key)
 
+            # Reset the indices.
+            self.index_reset()
+
         # Otherwise add a new object.
         else:
             # Add the tag object.
@@ -437,11 +789,33 @@ class TagTranslationTable(dict):
             # Add the key to the ordered list.
             self._key_list.append(key)
 
+            # Reset the indices.
+            self.index_reset()
+
+
+    def freeze(self):
+        """Freeze all tag objects of the table, so that they can be shared."""
+
+        # Loop over the tag objects.
+        for obj in self.values():
+            obj.frozen = True
+
+
+    def index_reset(self):
+        """Reset the indices of the CategoryList holding this table, if any."""
+
+        # Reset.
+        if self.category_list != None:
+            self.category_list.index_reset()
+
 
 
 class TagObject(object):
     """An object for filling the translation table."""
 
+    # The tag information of frozen objects cannot be changed.
+    frozen = False
+
     def __init__(self, category, var_name=None, tag_name=None, allowed=None, default=None, format='str', missing=True):
         """Setup the internal variables.
 
@@ -475,18 +849,63 @@ class TagObject(object):
         self.format = format
 
 
+    def __setattr__(self, name, value):
+        """Set the attribute, resetting the cached full tag name if the tag name changes and the indices of the CategoryList if the tag or variable name changes.
+
+        @param name:    The attribute name.
+        @type name:     str
+        @param value:   The attribute value.
+        @type value:    anything
+        """
+
+        # Frozen tag information.
+        if self.frozen and name in ['allowed', 'missing', 'tag_name', 'var_name', 'default', 'format']:
+            raise NameError("The %s of the frozen tag object cannot be changed." % name)
+
+        # Reset the cache.
+        if name == 'tag_name':
+            object.__setattr__(self, '_tag_name_full', None)
+
+        # Set the attribute.
+        object.__setattr__(self, name, value)
+
+        # Reset the indices.
+        if name in ['tag_name', 'var_name']:
+            self.category.index_reset()
+
+
+    def clone(self, category):
+        """Return an unfrozen copy of the tag object for the given tag category.
+
+        @param category:    The tag category class object of the copy.
+        @type category:     TagTranslationTable instance
+        @return:            The tag object copy.
+        @rtype:             TagObject instance
+        """
+
+        # Copy the tag information.
+        return TagObject(category, var_name=self.var_name, tag_name=self.tag_name, allowed=self.allowed, default=self.default, format=self.format, missing=self.missing)
+
+
     def tag_name_full(self):
         """Add the prefix to the tag name and return the full tag name.
 
+        The name is cached until the tag name or the tag prefix of the category changes.
+
         @return:    The full tag name with prefix.
         @rtype:     str
         """
 
-        # Return the name.
+        # No tag name.
         if not self.tag_name:
             return None
-        else:
-            return self.category.tag_prefix + self.tag_name
+
+        # Build and cache the name.
+        if self._tag_name_full == None:
+            self._tag_name_full = self.category.tag_prefix + self.tag_name
+
+        # Return the name.
+        return self._tag_name_full
 
 
 
@@ -516,6 +935,49 @@ class TagCategory(TagTranslationTable):
         self.tag_category_label = None
 
 
+    @property
+    def tag_prefix(self):
+        """The tag name prefix of the full tag names.
+
+        @return:    The tag prefix.
+        @rtype:     str
+        """
+
+        # Return the prefix.
+        return self._tag_prefix
+
+
+    @tag_prefix.setter
+    def tag_prefix(self, value):
+        """Set the tag prefix, resetting the cached full tag names if it changes.
+
+        The tag objects shared with the frozen tag schema are not reset, as their names belong to the schema, but are replaced by own copies.
+
+        @param value:   The tag prefix.
+        @type value:    str
+        """
+
+        # The tag prefix is unchanged.
+        if self.__dict__.get('_tag_prefix') == value:
+            return
+
+        # Set the prefix.
+        self._tag_prefix = value
+
+        # Reset the cache of all tag objects.
+        for key, obj in list(self.items()):
+            # Copy the shared tag objects.
+            if obj.category is not self:
+                self[key] = obj.clone(self)
+
+            # Reset the own tag objects.
+            else:
+                obj._tag_name_full = None
+
+        # Reset the indices.
+        self.index_reset()
+
+
     def _N(self):
         """Determine the length of the variables.
 
@@ -547,11 +1009,44 @@ class TagCategory(TagTranslationTable):
         return N
 
 
-    def create(self):
-        """Create the tag category."""
+    def clone(self, sf):
+        """Return a copy of the tag category for the given saveframe.
+
+        The tag objects are shared with this tag category, whereas the data related state belongs to the copy.  The shared tag objects keep their cached full tag names, as long as the tag prefix of the copy is not changed.
+
+        @param sf:  The saveframe object.
+        @type sf:   saveframe instance
+        @return:    The tag category copy.
+        @rtype:     TagCategory instance
+        """
+
+        # A new instance, skipping the tag set up of __init__().
+        cat = self.__class__.__new__(self.__class__)
+
+        # Share the tag objects and copy the tag category info.
+        dict.update(cat, self)
+        cat.__dict__.update(self.__dict__)
+
+        # The per saveframe state.
+        cat.sf = sf
+        cat.N = None
+        cat._key_list = self._key_list[:]
+        cat.category_list = None
+
+        # Return the copy.
+        return cat
+
+
+    def create(self, setup=True):
+        """Create the tag category.
+
+        @keyword setup: A flag which if False will skip the tag_setup() call, for when the tag names have already been set up.
+        @type setup:    bool
+        """
 
         # Init.
-        self.tag_setup()
+        if setup:
+            self.tag_setup()
         tag_names = []
         tag_values = []
 
@@ -606,26 +1101,31 @@ class TagCategory(TagTranslationTable):
         self.sf.frame.tagtables.append(table)
 
 
-    def extract_tag_data(self, tagtable):
+    def extract_tag_data(self, tagtable, typed=False):
         """Extract all of the tag data from the tagtable, placing it into the designated variable names.
 
         @param tagtable:    The tagtable.
         @type tagtable:     Tagtable instance
+        @keyword typed:     A flag which if True will convert the looped int and float tag data into NumPy arrays via misc.translate_array().
+        @type typed:        bool
         """
 
+        # The column index of each tag name (the first for duplicated names).
+        columns = {}
+        for index in range(len(tagtable.tagnames)):
+            columns.setdefault(tagtable.tagnames[index], index)
+
         # Loop over the variables.
         for key in self._key_list:
             # No corresponding tag in the tagtable.
-            if self[key].tag_name_full() not in tagtable.tagnames:
+            index = columns.get(self[key].tag_name_full())
+            if index == None:
                 continue
 
             # Currently no corresponding variable in the tag category.
             if self[key].var_name == None:
                 continue
 
-            # Find the index of the tag.
-            index = tagtable.tagnames.index(self[key].tag_name_full())
-
             # The data.
             data = tagtable.tagvalues[index]
 
@@ -633,6 +1133,14 @@ class TagCategory(TagTranslationTable):
             if self.free:
                 data = data[0]
 
+            # Typed data, converted in one go.
+            elif typed and self[key].format in ['int', 'float']:
+                data = translate_array(data, format=self[key].format)
+
+            # Columnar tagtable data (convert to a list).
+            elif not isinstance(data, list):
+                data = list(data)
+
             # Set the data.
             setattr(self.sf, self[key].var_name, data)
 
@@ -683,10 +1191,11 @@ class TagCategory(TagTranslationTable):
         else:
             self.sep = '.'
 
-        # Create the full tag label.
-        self.tag_prefix = '_'
+        # Create the full tag label, set once so that the cached full tag names are only reset if it changes.
+        tag_prefix = '_'
         if self.tag_category_label:
-            self.tag_prefix = self.tag_prefix + self.tag_category_label + self.sep
+            tag_prefix = tag_prefix + self.tag_category_label + self.sep
+        self.tag_prefix = tag_prefix
 
 
 
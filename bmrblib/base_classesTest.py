@@ -0,0 +1,218 @@
+from numpy import isnan, ma, ndarray
+from os import close, remove
+from tempfile import mkstemp
+from unittest import TestCase
+import unittest
+from bmrblib.base_classes import CategoryList, TagCategory
+from bmrblib.misc import translate_array
+from bmrblib.nmr_star_dict_v3_1 import NMR_STAR_v3_1
+
+
+## The keyword arguments of the software saveframes
+software = [dict(name='relax%s' % i, version='1.%s' % i, vendor_name='me', cite_ids=[1, 2], task=['a', 'b']) for i in range(3)]
+
+## The keyword arguments of a relaxation saveframe with missing data
+relaxation = dict(data_type='R1', sample_cond_list_id=1, sample_cond_list_label='cond', temp_calibration='methanol', temp_control='single scan interleaving', peak_intensity_type='height', frq=600e6, assembly_atom_ids=[1, 2, 3], entity_assembly_ids=[1, 1, 1], entity_ids=[1, 1, 1], res_nums=[1, 2, 3], res_names=['ALA', 'GLY', 'SER'], atom_names=['N', 'N', 'N'], atom_types=['N', 'N', 'N'], isotope=[15, 15, 15], data=[1.0, None, 2.5], errors=[0.1, 0.2, None])
+
+
+class AllChecks(TestCase):
+    def category(self, label='Test', var_name='name'):
+        cat = TagCategory(None)
+        cat.tag_category_label = label
+        cat.add(key='Name', var_name=var_name, tag_name='Name')
+        cat.tag_setup()
+        return cat
+
+    def testtag_setup_cache(self):
+        """TagCategory.tag_setup keeps the cached full tag names"""
+        cat = self.category()
+        cat.tag_setup()
+        name = cat['Name'].tag_name_full()
+        self.assertEqual(name, '_Test.Name')
+
+        ## A repeated set up keeps the cached names
+        cat.tag_setup()
+        self.assertIs(cat['Name']._tag_name_full, name)
+
+        ## A new prefix resets them
+        cat.tag_setup(tag_category_label='Other')
+        self.assertEqual(cat['Name'].tag_name_full(), '_Other.Name')
+
+    def testclone_cache(self):
+        """TagCategory.clone shares the cached full tag names of the frozen tag objects"""
+        cat = self.category()
+        cat.tag_setup()
+        cat.freeze()
+        name = cat['Name'].tag_name_full()
+
+        ## The set up of the copy keeps the shared names
+        cat_clone = cat.clone(None)
+        cat_clone.tag_setup()
+        self.assertIs(cat_clone['Name'], cat['Name'])
+        self.assertIs(cat['Name']._tag_name_full, name)
+
+        ## A new prefix of the copy leaves the shared tag objects alone
+        cat_clone.tag_setup(tag_category_label='Other')
+        self.assertEqual(cat_clone['Name'].tag_name_full(), '_Other.Name')
+        self.assertIs(cat_clone['Name'].category, cat_clone)
+        self.assertIs(cat['Name']._tag_name_full, name)
+
+    def testadd_many(self):
+        """BaseSaveframe.add_many and add create the same saveframes"""
+        star = NMR_STAR_v3_1('many', '')
+        self.assertEqual(star.software.add_many(software), [1, 2, 3])
+        star_add = NMR_STAR_v3_1('many', '')
+        for keywords in software:
+            star_add.software.add(**keywords)
+        self.assertEqual(star.data.star_text(), star_add.data.star_text())
+
+        ## The tag metadata is compiled once per class
+        self.assertIs(star.software.compile_tags(), star_add.software.compile_tags())
+
+    def testtag_index(self):
+        """CategoryList.tag_positions index kept over BaseSaveframe.loop calls"""
+        star = NMR_STAR_v3_1('index', '')
+        star.software.add_many(software)
+        self.assertEqual(len(list(star.software.loop())), 3)
+        tag_categories = star.software.tag_categories
+        tag_index = tag_categories.tag_index
+        self.assertEqual(len(list(star.software.loop())), 3)
+        self.assertIs(tag_categories.tag_index, tag_index)
+
+        ## A new tag prefix resets the index
+        tag_categories[0].tag_setup(tag_category_label='Other')
+        self.assertEqual(tag_categories.tag_index, None)
+        self.assertEqual(tag_categories.tag_positions('_Other.Name'), ((0, 'Name'),))
+
+    def testcategory_list_mutation(self):
+        """CategoryList lookups after changes to the list and its tag objects"""
+        cats = CategoryList()
+        cats.append(self.category('A', 'a'))
+        cats.append(self.category('B', 'b'))
+        self.assertEqual(cats.get_tag('a'), (0, 'Name', cats[0]['Name']))
+        self.assertEqual(cats.get_tag('b'), (1, 'Name', cats[1]['Name']))
+        self.assertEqual(cats.get_tag('c'), None)
+        self.assertEqual(cats.tag_positions('_B.Name'), ((1, 'Name'),))
+
+        # Append.
+        cats.append(self.category('C', 'c'))
+        self.assertEqual(cats.get_tag('c'), (2, 'Name', cats[2]['Name']))
+        self.assertEqual(cats.tag_positions('_C.Name'), ((2, 'Name'),))
+
+        # Replace an item.
+        cats[0] = self.category('D', 'd')
+        self.assertEqual(cats.get_tag('a'), None)
+        self.assertEqual(cats.get_tag('d'), (0, 'Name', cats[0]['Name']))
+        self.assertEqual(cats.tag_positions('_A.Name'), ())
+        self.assertEqual(cats.tag_positions('_D.Name'), ((0, 'Name'),))
+
+        # Replace a slice.
+        cats[1:2] = [self.category('E', 'e'), self.category('F', 'f')]
+        self.assertEqual(cats.get_tag('b'), None)
+        self.assertEqual(cats.get_tag('f')[0], 2)
+        self.assertEqual(cats.get_tag('c')[0], 3)
+
+        # Remove items.
+        del cats[1]
+        self.assertEqual(cats.get_tag('e'), None)
+        self.assertEqual(cats.get_tag('f')[0], 1)
+        cats.pop(0)
+        self.assertEqual(cats.get_tag('f')[0], 0)
+        self.assertEqual(cats.tag_positions('_C.Name'), ((1, 'Name'),))
+
+        # Reassign the tag and variable names of a tag object.
+        cats[0]['Name'].tag_name = 'Title'
+        self.assertEqual(cats.tag_positions('_F.Name'), ())
+        self.assertEqual(cats.tag_positions('_F.Title'), ((0, 'Name'),))
+        cats[0]['Name'].var_name = 'title'
+        self.assertEqual(cats.get_tag('f'), None)
+        self.assertEqual(cats.get_tag('title'), (0, 'Name', cats[0]['Name']))
+
+        # Re-add a key.
+        cats[1].add(key='Name', var_name='c2', tag_name='Name2')
+        self.assertEqual(cats.get_tag('c'), None)
+        self.assertEqual(cats.get_tag('c2')[0], 1)
+        self.assertEqual(cats.tag_positions('_C.Name2'), ((1, 'Name'),))
+
+        # Duplicate variable names keep the first match.
+        cats.insert(0, self.category('G', 'title'))
+        self.assertEqual(cats.get_tag('title'), (0, 'Name', cats[0]['Name']))
+        self.assertEqual(cats.tag_positions('_F.Title'), ((1, 'Name'),))
+
+        # Frozen tag objects cannot be renamed.
+        cats[0].freeze()
+        self.assertRaises(NameError, setattr, cats[0]['Name'], 'tag_name', 'Other')
+        self.assertEqual(cats.get_tag('title')[0], 0)
+
+    def testtranslate_array(self):
+        """misc.translate_array with missing values"""
+        data = translate_array(['1.5', '?', '-2e3', '.'])
+        self.assertEqual(data.dtype, 'float64')
+        self.assertEqual(data[0], 1.5)
+        self.assertEqual(data[2], -2000.0)
+        self.assertTrue(isnan(data[1]) and isnan(data[3]))
+
+        data = translate_array(['1', '.', '-3', '?'], format='int')
+        self.assertEqual(data.dtype, 'int64')
+        self.assertEqual(list(data.mask), [False, True, False, True])
+        self.assertEqual(data.compressed().tolist(), [1, -3])
+
+        ## Data without missing values
+        self.assertEqual(translate_array(['7', '8'], format='int').tolist(), [7, 8])
+        self.assertEqual(translate_array(['7', '8']).tolist(), [7.0, 8.0])
+
+        ## Unknown formats
+        self.assertRaises(NameError, translate_array, ['a'], format='str')
+
+    def testloop_typed(self):
+        """BaseSaveframe.loop(typed=True) gives the untyped data as NumPy arrays"""
+        handle, file_name = mkstemp(suffix='.str')
+        close(handle)
+        self.addCleanup(remove, file_name)
+        star = NMR_STAR_v3_1('typed', file_name)
+        star.relaxation.add(**relaxation)
+        star.write()
+
+        # Use both missing values, '.' for the last error.
+        with open(file_name) as file:
+            text = file.read()
+        self.assertEqual(text.count(' 2.5 ? '), 1)
+        with open(file_name, 'w') as file:
+            file.write(text.replace(' 2.5 ? ', ' 2.5 . '))
+
+        star = NMR_STAR_v3_1('typed', file_name)
+        star.read()
+        untyped = list(star.relaxation.loop())
+        typed = list(star.relaxation.loop(typed=True))
+        self.assertEqual(len(untyped), 1)
+        self.assertEqual(len(typed), 1)
+        untyped = untyped[0]
+        typed = typed[0]
+        self.assertEqual(sorted(typed), sorted(untyped))
+
+        # Convert the untyped data by hand.
+        arrays = 0
+        for key in untyped:
+            value = untyped[key]
+            if isinstance(typed[key], ma.MaskedArray):
+                arrays += 1
+                self.assertEqual(typed[key].dtype, 'int64')
+                self.assertEqual(list(typed[key].mask), [val is None for val in value])
+                self.assertEqual(typed[key].compressed().tolist(), [val for val in value if val is not None])
+            elif isinstance(typed[key], ndarray):
+                arrays += 1
+                self.assertEqual(typed[key].dtype, 'float64')
+                self.assertEqual([None if isnan(val) else val for val in typed[key].tolist()], value)
+            else:
+                self.assertEqual(typed[key], value)
+        self.assertTrue(arrays)
+
+        # The relaxation data itself.
+        self.assertEqual(untyped['data'], [1.0, None, 2.5])
+        self.assertEqual(untyped['errors'], [0.1, 0.2, None])
+        self.assertEqual(untyped['res_nums'], [1, 2, 3])
+        self.assertEqual(typed['res_nums'].tolist(), [1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+from io import DEFAULT_BUFFER_SIZE, BytesIO, StringIO
+from mmap import ACCESS_READ, mmap
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest import TestCase
+import unittest
+from bmrblib import determine_version, read_many
+from bmrblib.nmr_star_dict_v3_1 import NMR_STAR_v3_1
+
+
+## The header of an NMR-STAR 3.1 file
+header_v3_1 = """data_test
+
+save_entry_information
+   _Entry.Sf_category                 entry_information
+   _Entry.Sf_framecode                entry_information
+   _Entry.ID                          test
+   _Entry.NMR_STAR_version            3.1.1.61
+"""
+
+## The header of an NMR-STAR 2.1 file
+header_v2_1 = """data_test
+
+save_entry_information
+   _Saveframe_category      entry_information
+   _Entry_title             test
+   _NMR_STAR_version        2.1.1
+"""
+
+
+class AllChecks(TestCase):
+    def setUp(self):
+        self.dir = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.dir)
+
+    def write(self, file_name, text):
+        file_path = path.join(self.dir, file_name)
+        with open(file_path, 'w') as file:
+            file.write(text)
+        return file_path
+
+    def testdetermine_version(self):
+        """determine_version with file paths"""
+        self.assertEqual(determine_version(self.write('v3_1.str', header_v3_1)), '3.1.1.61')
+        self.assertEqual(determine_version(self.write('v2_1.str', header_v2_1)), '2.1.1')
+
+        # No version tag.
+        self.assertEqual(determine_version(self.write('none.str', "data_test\n")), None)
+        self.assertEqual(determine_version(self.write('empty.str', "")), None)
+
+    def testdetermine_version_handles(self):
+        """determine_version with open text and binary file handles"""
+        file_path = self.write('v3_1.str', header_v3_1)
+        with open(file_path) as file:
+            self.assertEqual(determine_version(file), '3.1.1.61')
+            self.assertFalse(file.closed)
+        with open(file_path, 'rb') as file:
+            self.assertEqual(determine_version(file), '3.1.1.61')
+            self.assertFalse(file.closed)
+        with open(file_path, 'rb') as file:
+            with mmap(file.fileno(), 0, access=ACCESS_READ) as data:
+                self.assertEqual(determine_version(data), '3.1.1.61')
+
+        # In memory files.
+        self.assertEqual(determine_version(StringIO(header_v2_1)), '2.1.1')
+        self.assertEqual(determine_version(BytesIO(header_v2_1.encode())), '2.1.1')
+        self.assertEqual(determine_version(BytesIO(b"data_test\n")), None)
+
+        # Reading from the current position.
+        file = StringIO(header_v3_1 + header_v2_1)
+        file.seek(len(header_v3_1))
+        self.assertEqual(determine_version(file), '2.1.1')
+
+    def testdetermine_version_late(self):
+        """determine_version with the version tag past the first chunk of the file"""
+        comments = "# A comment line to push the version tag further into the file.\n" * (4 * DEFAULT_BUFFER_SIZE // 64)
+        text = header_v3_1.replace('   _Entry.NMR_STAR_version', comments + '   _Entry.NMR_STAR_version')
+        self.assertGreater(text.index('NMR_STAR_version'), 4 * DEFAULT_BUFFER_SIZE)
+        file_path = self.write('late.str', text)
+        self.assertEqual(determine_version(file_path), '3.1.1.61')
+        with open(file_path, 'rb') as file:
+            self.assertEqual(determine_version(file), '3.1.1.61')
+
+        # A single line longer than the chunk.
+        text = header_v2_1.replace('   _NMR_STAR_version', '   _Details "%s"\n   _NMR_STAR_version' % ('x' * 4 * DEFAULT_BUFFER_SIZE))
+        self.assertEqual(determine_version(self.write('long.str', text)), '2.1.1')
+
+    def testread_many(self):
+        """read_many with two files"""
+        # Two files with different software, the first one taking longer to read.
+        file_paths = []
+        for name, count in [('relax', 500), ('modelfree', 1)]:
+            file_path = path.join(self.dir, name + '.str')
+            star = NMR_STAR_v3_1('read_many', file_path)
+            star.software.add_many([dict(name=name, version='1.0', vendor_name='me', cite_ids=[1], task=['a'])] * count)
+            star.write()
+            file_paths.append(file_path)
+
+        # The results in the order of the files, for both orders.
+        for paths in (file_paths, file_paths[::-1]):
+            results = list(read_many(paths, ['software', 'relaxation'], workers=2, version='3.1'))
+            self.assertEqual([result[0] for result in results], paths)
+            for file_path, data in results:
+                self.assertEqual(len(data['software']), 500 if file_path == file_paths[0] else 1)
+                self.assertEqual(data['software'][0]['name'], path.basename(file_path)[:-4])
+                self.assertEqual(data['relaxation'], [])
+
+        # Unordered results.
+        results = list(read_many(file_paths, ['software'], workers=2, ordered=False, version='3.1'))
+        self.assertEqual(sorted(result[0] for result in results), sorted(file_paths))
+
+        # An error in one file reaches the caller, after the results of the files before it.
+        missing = path.join(self.dir, 'missing.str')
+        for ordered in (True, False):
+            results = read_many([file_paths[0], missing], ['software'], workers=2, ordered=ordered, version='3.1')
+            if ordered:
+                self.assertEqual(next(results)[0], file_paths[0])
+            self.assertRaises(FileNotFoundError, list, results)
+
+        # Bad chunk sizes.
+        self.assertRaises(NameError, list, read_many(file_paths, ['software'], chunksize=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -39,17 +39,19 @@ from bmrblib.kinetics.heteronucl_T2_relaxation_v3_1 import HeteronuclT2Saveframe
 class Relaxation_v2_1:
     """Class for the relaxation data part of the BMRB API."""
 
-    def __init__(self, datanodes):
+    def __init__(self, datanodes, star_version=None):
         """Initialise the class, placing the pystarlib data nodes into the namespace.
 
-        @param datanodes:   The pystarlib data nodes object.
-        @type datanodes:    list
+        @param datanodes:       The pystarlib data nodes object.
+        @type datanodes:        list
+        @keyword star_version:  The NMR-STAR version information of the data nodes.
+        @type star_version:     None or Star_version instance
         """
 
         # Initialise the kinetic saveframe supergroups.
-        self.heteronucl_NOEs = HeteronuclNOESaveframe_v2_1(datanodes)
-        self.heteronucl_T1_relaxation = HeteronuclT1Saveframe_v2_1(datanodes)
-        self.heteronucl_T2_relaxation = HeteronuclT2Saveframe_v2_1(datanodes)
+        self.heteronucl_NOEs = HeteronuclNOESaveframe_v2_1(datanodes, star_version)
+        self.heteronucl_T1_relaxation = HeteronuclT1Saveframe_v2_1(datanodes, star_version)
+        self.heteronucl_T2_relaxation = HeteronuclT2Saveframe_v2_1(datanodes, star_version)
 
 
     def add(self, **keywords):
@@ -118,21 +120,25 @@ class Relaxation_v2_1:
             self.heteronucl_NOEs.add(**keywords)
 
 
-    def loop(self):
-        """Generator method for looping over and returning all relaxation data."""
+    def loop(self, typed=False):
+        """Generator method for looping over and returning all relaxation data.
+
+        @keyword typed: A flag which if True will return the looped int and float data as NumPy arrays.
+        @type typed:    bool
+        """
 
         # The NOE data.
-        for data in self.heteronucl_NOEs.loop():
+        for data in self.heteronucl_NOEs.loop(typed=typed):
             data['data_type'] = 'NOE'
             yield data
 
         # The R1 data.
-        for data in self.heteronucl_T1_relaxation.loop():
+        for data in self.heteronucl_T1_relaxation.loop(typed=typed):
             data['data_type'] = 'R1'
             yield data
 
         # The R2 data.
-        for data in self.heteronucl_T2_relaxation.loop():
+        for data in self.heteronucl_T2_relaxation.loop(typed=typed):
             data['data_type'] = 'R2'
             yield data
 
@@ -141,36 +147,40 @@ class Relaxation_v2_1:
 class Relaxation_v3_0(Relaxation_v2_1):
     """Class for the relaxation data part of the BMRB API (v3.0)."""
 
-    def __init__(self, datanodes):
+    def __init__(self, datanodes, star_version=None):
         """Initialise the class, placing the pystarlib data nodes into the namespace.
 
-        @param datanodes:   The pystarlib data nodes object.
-        @type datanodes:    list
+        @param datanodes:       The pystarlib data nodes object.
+        @type datanodes:        list
+        @keyword star_version:  The NMR-STAR version information of the data nodes.
+        @type star_version:     None or Star_version instance
         """
 
         # Execute the base class __init__() method.
-        Relaxation_v2_1.__init__(self, datanodes)
+        Relaxation_v2_1.__init__(self, datanodes, star_version)
 
 
 
 class Relaxation_v3_1(Relaxation_v3_0):
     """Class for the relaxation data part of the BMRB API (v3.1)."""
 
-    def __init__(self, datanodes):
+    def __init__(self, datanodes, star_version=None):
         """Initialise the class, placing the pystarlib data nodes into the namespace.
 
-        @param datanodes:   The pystarlib data nodes object.
-        @type datanodes:    list
+        @param datanodes:       The pystarlib data nodes object.
+        @type datanodes:        list
+        @keyword star_version:  The NMR-STAR version information of the data nodes.
+        @type star_version:     None or Star_version instance
         """
 
         # Execute the base class __init__() method.
-        Relaxation_v3_0.__init__(self, datanodes)
+        Relaxation_v3_0.__init__(self, datanodes, star_version)
 
         # Initialise the kinetic saveframe supergroups.
-        self.heteronucl_NOEs = HeteronuclNOESaveframe_v3_1(datanodes)
-        self.heteronucl_T1_relaxation = HeteronuclT1Saveframe_v3_1(datanodes)
-        self.heteronucl_T2_relaxation = HeteronuclT2Saveframe_v3_1(datanodes)
-        self.auto_relaxation = AutoRelaxationSaveframe_v3_1(datanodes)
+        self.heteronucl_NOEs = HeteronuclNOESaveframe_v3_1(datanodes, star_version)
+        self.heteronucl_T1_relaxation = HeteronuclT1Saveframe_v3_1(datanodes, star_version)
+        self.heteronucl_T2_relaxation = HeteronuclT2Saveframe_v3_1(datanodes, star_version)
+        self.auto_relaxation = AutoRelaxationSaveframe_v3_1(datanodes, star_version)
 
 
     def add(self, **keywords):
@@ -237,26 +247,30 @@ class Relaxation_v3_1(Relaxation_v3_0):
             self.heteronucl_NOEs.add(**keywords)
 
 
-    def loop(self):
-        """Generator method for looping over and returning all relaxation data."""
+    def loop(self, typed=False):
+        """Generator method for looping over and returning all relaxation data.
+
+        @keyword typed: A flag which if True will return the looped int and float data as NumPy arrays.
+        @type typed:    bool
+        """
 
         # The NOE data.
-        for data in self.heteronucl_NOEs.loop():
+        for data in self.heteronucl_NOEs.loop(typed=typed):
             data['data_type'] = 'NOE'
             yield data
 
         # The R1 data.
-        for data in self.heteronucl_T1_relaxation.loop():
+        for data in self.heteronucl_T1_relaxation.loop(typed=typed):
             data['data_type'] = 'R1'
             yield data
 
         # The R2 data.
-        for data in self.heteronucl_T2_relaxation.loop():
+        for data in self.heteronucl_T2_relaxation.loop(typed=typed):
             data['data_type'] = 'R2'
             yield data
 
 
         # The auto-relaxation data.
-        for data in self.auto_relaxation.loop():
+        for data in self.auto_relaxation.loop(typed=typed):
             data['data_type'] = data['coherence_common_name']
             yield data
@@ -26,10 +26,14 @@ This file is part of the U{BMRB library<https://gna.org/projects/bmrblib>}.
 """
 
 # Python module imports.
-from numpy import ndarray
+from numpy import array, float64, int64, ma, ndarray, where
 from warnings import warn
 
 
+# The NMR-STAR strings for missing values.
+MISSING_VALUES = frozenset(['?', '.'])
+
+
 def no_missing(data, name):
     """Check that there are no None values in the data.
 
@@ -69,15 +73,16 @@ def translate(data, format='str', reverse=False):
 
     # From Python to NMR-STAR.
     if not reverse:
-        # List data (including numpy arrays).
-        if isinstance(data, list) or isinstance(data, ndarray):
-            # Loop over the data.
-            new_data = []
-            for i in range(len(data)):
-                if data[i] == None or data[i] == 'None':
-                    new_data.append('?')
-                else:
-                    new_data.append(str(data[i]))
+        # Numeric numpy arrays, converted in one go (masked values are missing).
+        if isinstance(data, ndarray) and data.ndim == 1 and data.dtype.kind in 'biuf':
+            strings = data.view(ndarray).astype(str)
+            if ma.isMaskedArray(data):
+                strings = where(ma.getmaskarray(data), '?', strings)
+            new_data = strings.tolist()
+
+        # List data (including other numpy arrays).
+        elif isinstance(data, list) or isinstance(data, ndarray):
+            new_data = ['?' if val is None or (isinstance(val, str) and val == 'None') else str(val) for val in data]
 
         # None.
         elif data == None:
@@ -103,16 +108,10 @@ def translate(data, format='str', reverse=False):
 
         # List data.
         if isinstance(data, list):
-            # Loop over the data.
-            new_data = []
-            for i in range(len(data)):
-                if data[i] in ['?', '.']:
-                    new_data.append(None)
-                else:
-                    new_data.append(convert(data[i]))
+            new_data = [None if val in MISSING_VALUES else convert(val) for val in data]
 
         # None.
-        elif data in ['?', '.']:
+        elif data in MISSING_VALUES:
             new_data = None
 
         # Otherwise normal conversion.
@@ -121,3 +120,35 @@ def translate(data, format='str', reverse=False):
 
     # Return the translated result.
     return new_data
+
+
+def translate_array(data, format='float'):
+    """Convert a list of NMR-STAR strings into a NumPy array in one vectorised operation.
+
+    The missing values '?' and '.' become NaN for floats.  For integers a masked array is returned with the missing values masked.
+
+    @param data:        The NMR-STAR string data.
+    @type data:         list of str
+    @keyword format:    The format to convert to.  This can be 'int' or 'float'.
+    @type format:       str
+    @return:            The typed data.
+    @rtype:             numpy float64 array or numpy int64 masked array
+    """
+
+    # The strings and the missing values.
+    data = array(data, dtype=object)
+    missing = (data == '?') | (data == '.')
+
+    # Floats, with NaN for the missing values.
+    if format == 'float':
+        data[missing] = 'nan'
+        return data.astype(float64)
+
+    # Integers, masking the missing values.
+    elif format == 'int':
+        data[missing] = '0'
+        return ma.masked_array(data.astype(int64), mask=missing)
+
+    # Unknown format.
+    else:
+        raise NameError("The format '%s' cannot be converted to an array." % format)
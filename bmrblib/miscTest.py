@@ -0,0 +1,64 @@
+from unittest import TestCase
+import unittest
+from numpy import array, float32, float64, int64, ma, nan, ndarray, uint8
+from bmrblib.misc import translate
+
+
+def translate_elementwise(data):
+    """The element by element translation to NMR-STAR strings, as before the vectorised translate"""
+    if isinstance(data, list) or isinstance(data, ndarray):
+        new_data = []
+        for i in range(len(data)):
+            if data[i] == None or data[i] == 'None':
+                new_data.append('?')
+            else:
+                new_data.append(str(data[i]))
+        return new_data
+    elif data == None:
+        return '?'
+    return str(data)
+
+
+class AllChecks(TestCase):
+    def testtranslate(self):
+        """translate to NMR-STAR strings compared to the element by element translation"""
+        cases = [
+            None, 'None', nan, float('nan'), True, False, 0, 1.5, 'x',
+            float64(0.1), int64(3),
+            [], [None, 'None', 1, 2.5, 'a', True, nan],
+            [[1, None], [2]],
+            array([1.0, nan, 0.1, 1e20, -0.0]),
+            array([1, 2, -3]),
+            array([True, False]),
+            array([0.1], dtype=float32),
+            array([1, 2], dtype=uint8),
+            array([], dtype=float64),
+            array(['a', 'None'], dtype=object),
+            array([None, 1.5], dtype=object),
+            ]
+        for data in cases:
+            self.assertEqual(translate(data), translate_elementwise(data), msg=repr(data))
+
+    def testtranslate_zero_dim(self):
+        """translate of 0-d arrays"""
+        for data in (array(5), array(None)):
+            self.assertRaises(TypeError, translate_elementwise, data)
+            self.assertRaises(TypeError, translate, data)
+
+    def testtranslate_masked(self):
+        """translate of masked arrays, masked values being missing"""
+        data = ma.masked_array([1, 2, 3], mask=[False, True, False])
+        self.assertEqual(translate(data), ['1', '?', '3'])
+        data = ma.masked_array([0.5, nan], mask=[True, False])
+        self.assertEqual(translate(data), ['?', 'nan'])
+
+    def testtranslate_reverse(self):
+        """translate from NMR-STAR strings"""
+        self.assertEqual(translate(['1', '?', '.', '3'], format='int', reverse=True), [1, None, None, 3])
+        self.assertEqual(translate(['0.5', '?'], format='float', reverse=True), [0.5, None])
+        self.assertEqual(translate('.', format='str', reverse=True), None)
+        self.assertEqual(translate(None, reverse=True), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
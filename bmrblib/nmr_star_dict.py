@@ -27,6 +27,7 @@ This file is part of the U{BMRB library<https://gna.org/projects/bmrblib>}.
 
 # relax module imports.
 from bmrblib.pystarlib.File import File
+from bmrblib.version import Star_version
 
 
 class NMR_STAR:
@@ -35,28 +36,92 @@ class NMR_STAR:
     # Class extension string.
     ext = ''
 
+    # The default NMR-STAR version.
+    default_version = None
 
-    def __init__(self, title, file_path):
+
+    def __init__(self, title, file_path, version=None, cache=None):
         """Initialise the NMR-STAR dictionary object.
 
         @param title:       The title of the NMR-STAR data.
         @type title:        str
         @param file_path:   The full file path.
         @type file_path:    str
+        @keyword version:   The NMR-STAR version number.  If not given, the default version of the class is used.
+        @type version:      None or str
+        @keyword cache:     The cache of parsed files used when reading, or None to always parse the file.  See create_nmr_star() for the trust requirement of the cache directory.
+        @type cache:        None or pystarlib ParseCache instance
         """
 
+        # The version information of this object, passed on to the saveframe objects.
+        self.star_version = Star_version(version or self.default_version)
+
         # Initialise the pystarlib File object.
-        self.data = File(title=title, filename=file_path)
+        self.data = File(title=title, filename=file_path, cache=cache)
+
+        # The saveframe classes and arguments, for creating the saveframe objects on first use.
+        self.saveframe_classes = {}
 
-        # Create the class objects.
+        # Register the class objects.
         self.create_saveframes()
 
 
-    def read(self):
-        """Read the data from a BMRB NMR-STAR formatted file."""
+    def __getattr__(self, name):
+        """Create the registered saveframe object on first access.
+
+        @param name:    The attribute name.
+        @type name:     str
+        @return:        The saveframe object.
+        @rtype:         class instance
+        """
+
+        # Not a registered saveframe.
+        saveframe_classes = self.__dict__.get('saveframe_classes', {})
+        if name not in saveframe_classes:
+            raise AttributeError("'%s' object has no attribute '%s'" % (self.__class__.__name__, name))
+
+        # Create the object and store it, so this is only called once.
+        saveframe_class, args = saveframe_classes[name]
+        obj = saveframe_class(*args)
+        setattr(self, name, obj)
+
+        # Return the object.
+        return obj
+
+
+    def add_saveframe(self, name, saveframe_class, *args):
+        """Register a saveframe object, to be created on first access of the named attribute.
+
+        @param name:            The attribute name of the saveframe object.
+        @type name:             str
+        @param saveframe_class: The saveframe class.
+        @type saveframe_class:  class
+        @param args:            The arguments for initialising the saveframe class.
+        @type args:             tuple
+        """
+
+        # Remove any previously created object.
+        if name in self.__dict__:
+            delattr(self, name)
+
+        # Store the class and arguments.
+        self.saveframe_classes[name] = (saveframe_class, args)
+
+
+    def read(self, categories=None, columnar=False, workers=None):
+        """Read the data from a BMRB NMR-STAR formatted file.
+
+        @keyword categories:    The saveframe categories to read, e.g. ['heteronucl_T1_relaxation'].  Saveframes of any other category are skipped without being parsed.  If None, all saveframes are read.
+        @type categories:       None or list of str
+        @keyword columnar:      A flag which if True will store the values of the looped tagtables in compact columns rather than lists of strings.
+        @type columnar:         bool
+        @keyword workers:       The number of processes to parse the file with.  If more than one, the file is split at the saveframe boundaries and the parts are parsed in parallel.
+        @type workers:          None or int
+        """
 
         # Read the contents of the STAR formatted file.
-        self.data.read()
+        self.data.columnar = columnar
+        self.data.read(categories=categories, workers=workers)
 
 
     def write(self):
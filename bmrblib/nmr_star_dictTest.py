@@ -0,0 +1,118 @@
+from copy import copy, deepcopy
+from os import close, remove
+from pickle import dumps, loads
+from tempfile import mkstemp
+from unittest import TestCase
+import unittest
+from bmrblib.experimental_details.software_v3_1 import SoftwareSaveframe_v3_1
+from bmrblib.nmr_star_dict_v2_1 import NMR_STAR_v2_1
+from bmrblib.nmr_star_dict_v3_1 import NMR_STAR_v3_1
+
+
+## The keyword arguments of a software saveframe
+software = dict(name='relax', version='1.0', vendor_name='me', cite_ids=[1], task=['a'])
+
+## The tag names of the software saveframe for each version
+software_tags = {
+    '2.1': ['_Saveframe_category', '_ID', '_Name', '_Version', '_Citation_ID', '_Software_ID', '_Task', '_Software_ID', '_Name', '_Address', '_Electronic_address', '_SoftwareID'],
+    '3.1': ['_Software.Sf_category', '_Software.Sf_framecode', '_Software.ID', '_Software.Name', '_Software.Version', '_Software_citation.Citation_ID', '_Software_citation.Software_ID', '_Task.Task', '_Task.Software_ID', '_Vendor.Name', '_Vendor.Address', '_Vendor.Electronic_address', '_Vendor.SoftwareID']
+}
+
+
+class AllChecks(TestCase):
+    def testgetattr(self):
+        """NMR_STAR.__getattr__ creates the saveframe objects on first access"""
+        star = NMR_STAR_v3_1('lazy', '')
+        self.assertIn('software', star.saveframe_classes)
+        self.assertNotIn('software', star.__dict__)
+
+        # The first access creates and stores the object.
+        software = star.software
+        self.assertIsInstance(software, SoftwareSaveframe_v3_1)
+        self.assertIs(star.__dict__['software'], software)
+        self.assertIs(star.software, software)
+
+        # The object uses the data and version of the dictionary.
+        self.assertIs(software.datanodes, star.data.datanodes)
+        self.assertIs(software.star_version, star.star_version)
+
+        # The other saveframes are not created.
+        self.assertNotIn('relaxation', star.__dict__)
+
+    def testgetattr_unknown(self):
+        """NMR_STAR.__getattr__ with unknown attributes"""
+        star = NMR_STAR_v3_1('lazy', '')
+        self.assertRaises(AttributeError, getattr, star, 'no_saveframe')
+        self.assertFalse(hasattr(star, 'no_saveframe'))
+        self.assertEqual(getattr(star, 'no_saveframe', None), None)
+        self.assertNotIn('no_saveframe', star.__dict__)
+
+    def testadd_saveframe(self):
+        """NMR_STAR.add_saveframe replaces a created saveframe object"""
+        star = NMR_STAR_v3_1('lazy', '')
+        software = star.software
+        star.add_saveframe('software', SoftwareSaveframe_v3_1, star.data.datanodes, star.star_version)
+        self.assertNotIn('software', star.__dict__)
+        self.assertIsNot(star.software, software)
+
+        # A new name.
+        star.add_saveframe('software2', SoftwareSaveframe_v3_1, star.data.datanodes, star.star_version)
+        self.assertIsInstance(star.software2, SoftwareSaveframe_v3_1)
+
+    def testcopy(self):
+        """Copying and pickling NMR_STAR objects does not recurse through __getattr__"""
+        star = NMR_STAR_v3_1('lazy', '')
+        star.software.add(name='relax', version='1.0', vendor_name='me', cite_ids=[1], task=['a'])
+        text = star.data.star_text()
+
+        for star_copy in (copy(star), deepcopy(star), loads(dumps(star))):
+            self.assertEqual(star_copy.saveframe_classes.keys(), star.saveframe_classes.keys())
+            self.assertEqual(star_copy.data.star_text(), text)
+            self.assertIsInstance(star_copy.relaxation, star.relaxation.__class__)
+            self.assertRaises(AttributeError, getattr, star_copy, 'no_saveframe')
+
+        # Objects without an instance dictionary, as seen by copy and pickle before the state is set.
+        star_new = NMR_STAR_v3_1.__new__(NMR_STAR_v3_1)
+        self.assertRaises(AttributeError, getattr, star_new, 'software')
+        self.assertRaises(AttributeError, getattr, star_new, '__setstate__')
+
+    def testversions(self):
+        """NMR_STAR objects of different versions in the same process"""
+        # Create the objects one after the other.
+        stars = []
+        for star_class in (NMR_STAR_v3_1, NMR_STAR_v2_1, NMR_STAR_v3_1):
+            star = star_class('versions', '')
+            star.software.add(**software)
+            stars.append(star)
+
+        # Each object has its own version and tag names.
+        for star in stars:
+            version = star.default_version
+            self.assertEqual(star.star_version.version, version)
+            self.assertIs(star.software.star_version, star.star_version)
+            tags = []
+            for table in star.data.datanodes[0].tagtables:
+                tags += table.tagnames
+            self.assertEqual(tags, software_tags[version])
+        self.assertEqual(stars[0].data.star_text(), stars[2].data.star_text())
+
+        # Read the files of both versions back.
+        for star in stars[:2]:
+            handle, file_name = mkstemp(suffix='.str')
+            close(handle)
+            self.addCleanup(remove, file_name)
+            star.data.filename = file_name
+            star.write()
+            star_read = star.__class__('versions', file_name)
+            star_read.read()
+            data = list(star_read.software.loop())
+            self.assertEqual(len(data), 1)
+            self.assertEqual(data[0]['name'], software['name'])
+            self.assertEqual(data[0]['vendor_name'], [software['vendor_name']])
+
+        # The version 2.1 framecode comes from the saveframe title.
+        self.assertEqual(data[0]['sf_framecode'], 'relax_software_1')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -44,30 +44,34 @@ from bmrblib.pystarlib.File import File
 class NMR_STAR_v2_1(NMR_STAR):
     """The v2.1 NMR-STAR dictionary."""
 
+    # The default NMR-STAR version.
+    default_version = '2.1'
+
+
     def create_saveframes(self):
-        """Create all the saveframe objects."""
+        """Register all the saveframe objects, which are created on first use."""
 
         # Initialise Supergroup 2:  The citations.
-        self.citations = CitationsSaveframe(self.data.datanodes)
+        self.add_saveframe('citations', CitationsSaveframe, self.data.datanodes, self.star_version)
 
         # Initialise Supergroup 3:  The molecular assembly saveframe API.
-        self.entity = EntitySaveframe_v2_1(self.data.datanodes)
+        self.add_saveframe('entity', EntitySaveframe_v2_1, self.data.datanodes, self.star_version)
 
         # Initialise Supergroup 4:  The experimental descriptions saveframe API.
-        self.experiment = ExperimentSaveframe(self.data.datanodes)
-        self.method = MethodSaveframe(self.data.datanodes)
-        self.nmr_spectrometer = NMRSpectrometerSaveframe(self.data.datanodes)
-        self.sample_conditions = SampleConditionsSaveframe_v2_1(self.data.datanodes)
-        self.software = SoftwareSaveframe(self.data.datanodes)
+        self.add_saveframe('experiment', ExperimentSaveframe, self.data.datanodes, self.star_version)
+        self.add_saveframe('method', MethodSaveframe, self.data.datanodes, self.star_version)
+        self.add_saveframe('nmr_spectrometer', NMRSpectrometerSaveframe, self.data.datanodes, self.star_version)
+        self.add_saveframe('sample_conditions', SampleConditionsSaveframe_v2_1, self.data.datanodes, self.star_version)
+        self.add_saveframe('software', SoftwareSaveframe, self.data.datanodes, self.star_version)
 
         # Initialise Supergroup 5:  The NMR parameters saveframe API.
-        self.chem_shift_anisotropy = ChemShiftAnisotropySaveframe(self.data.datanodes)
+        self.add_saveframe('chem_shift_anisotropy', ChemShiftAnisotropySaveframe, self.data.datanodes, self.star_version)
 
         # Initialise Supergroup 6:  The kinetic data saveframe API.
-        self.relaxation = Relaxation_v2_1(self.data.datanodes)
+        self.add_saveframe('relaxation', Relaxation_v2_1, self.data.datanodes, self.star_version)
 
         # Initialise Supergroup 7:  The thermodynamics saveframe API.
-        self.model_free = ModelFreeSaveframe(self.data.datanodes)
+        self.add_saveframe('model_free', ModelFreeSaveframe, self.data.datanodes, self.star_version)
 
         # Initialise Supergroup 8:  The structure determination saveframes.
-        self.tensor = MissingSaveframe('Tensor')
+        self.add_saveframe('tensor', MissingSaveframe, 'Tensor')
@@ -45,30 +45,34 @@ from bmrblib.nmr_star_dict import NMR_STAR
 class NMR_STAR_v3_1(NMR_STAR):
     """The v3.1 NMR-STAR dictionary."""
 
+    # The default NMR-STAR version.
+    default_version = '3.1'
+
+
     def create_saveframes(self):
-        """Create all the saveframe objects."""
+        """Register all the saveframe objects, which are created on first use."""
 
         # Initialise Supergroup 2:  The citations.
-        self.citations = CitationsSaveframe_v3_1(self.data.datanodes)
+        self.add_saveframe('citations', CitationsSaveframe_v3_1, self.data.datanodes, self.star_version)
 
         # Initialise Supergroup 3:  The molecular assembly saveframe API.
-        self.entity = EntitySaveframe_v3_1(self.data.datanodes)
+        self.add_saveframe('entity', EntitySaveframe_v3_1, self.data.datanodes, self.star_version)
 
         # Initialise Supergroup 4:  The experimental descriptions saveframe API.
-        self.experiment = ExperimentSaveframe_v3_1(self.data.datanodes)
-        self.method = MethodSaveframe_v3_1(self.data.datanodes)
-        self.nmr_spectrometer = NMRSpectrometerSaveframe_v3_1(self.data.datanodes)
-        self.sample_conditions = SampleConditionsSaveframe_v3_1(self.data.datanodes)
-        self.software = SoftwareSaveframe_v3_1(self.data.datanodes)
+        self.add_saveframe('experiment', ExperimentSaveframe_v3_1, self.data.datanodes, self.star_version)
+        self.add_saveframe('method', MethodSaveframe_v3_1, self.data.datanodes, self.star_version)
+        self.add_saveframe('nmr_spectrometer', NMRSpectrometerSaveframe_v3_1, self.data.datanodes, self.star_version)
+        self.add_saveframe('sample_conditions', SampleConditionsSaveframe_v3_1, self.data.datanodes, self.star_version)
+        self.add_saveframe('software', SoftwareSaveframe_v3_1, self.data.datanodes, self.star_version)
 
         # Initialise Supergroup 5:  The NMR parameters saveframe API.
-        self.chem_shift_anisotropy = ChemShiftAnisotropySaveframe_v3_1(self.data.datanodes)
+        self.add_saveframe('chem_shift_anisotropy', ChemShiftAnisotropySaveframe_v3_1, self.data.datanodes, self.star_version)
 
         # Initialise Supergroup 6:  The kinetic data saveframe API.
-        self.relaxation = Relaxation_v3_1(self.data.datanodes)
+        self.add_saveframe('relaxation', Relaxation_v3_1, self.data.datanodes, self.star_version)
 
         # Initialise Supergroup 7:  The thermodynamics saveframe API.
-        self.model_free = ModelFreeSaveframe_v3_1(self.data.datanodes)
+        self.add_saveframe('model_free', ModelFreeSaveframe_v3_1, self.data.datanodes, self.star_version)
 
         # Initialise Supergroup 8:  The structure determination saveframes.
-        self.tensor = TensorSaveframe(self.data.datanodes)
+        self.add_saveframe('tensor', TensorSaveframe, self.data.datanodes, self.star_version)
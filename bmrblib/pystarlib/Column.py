@@ -0,0 +1,66 @@
+"""
+Columnar storage for the values of looped tagtables
+"""
+from array import array
+from collections.abc import Sequence
+from itertools import accumulate
+from itertools import islice
+
+
+"""
+A read only sequence of the string values of one tagtable column.
+Instead of a list with a string object for each value, all values are kept
+in a single string buffer together with an array of the offsets at which
+each value ends. A value is made into a string only when it is accessed.
+For a loop with many rows this takes several times less memory.
+A column compares equal to a list with the same values so it can stand in
+for the value lists in TagTable.tagvalues. To change values, turn the
+column into a list first, e.g. with TagTable.columns_expand.
+"""
+class Column (Sequence):
+    __slots__ = ( 'buffer', 'offsets' )
+
+    def __init__( self, values = () ):
+        if not isinstance( values, list ):
+            values = list( values )
+        self.buffer = ''.join( values )
+        ## Unsigned int offsets take 4 bytes which is plenty for most columns
+        if len( self.buffer ) < 2**32:
+            typecode = 'I'
+        else:
+            typecode = 'Q'
+        self.offsets = array( typecode, [ 0 ] )
+        self.offsets.extend( accumulate( map( len, values ) ) )
+
+    def __len__( self ):
+        return len( self.offsets ) - 1
+
+    def __getitem__( self, index ):
+        if isinstance( index, slice ):
+            return [ self[ i ] for i in range( *index.indices( len( self ) ) ) ]
+        if index < 0:
+            index += len( self )
+        if index < 0 or index >= len( self ):
+            raise IndexError( 'Column index out of range' )
+        return self.buffer[ self.offsets[ index ]:self.offsets[ index + 1 ] ]
+
+    def __iter__( self ):
+        buffer = self.buffer
+        for begin, end in zip( self.offsets, islice( self.offsets, 1, None ) ):
+            yield buffer[ begin:end ]
+
+    def __eq__( self, other ):
+        if isinstance( other, ( Column, list, tuple ) ):
+            return len( self ) == len( other ) and list( self ) == list( other )
+        return NotImplemented
+
+    def __ne__( self, other ):
+        result = self.__eq__( other )
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __repr__( self ):
+        return 'Column(%r)' % list( self )
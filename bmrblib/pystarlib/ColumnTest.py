@@ -0,0 +1,40 @@
+from unittest import TestCase
+import unittest
+from bmrblib.pystarlib.Column import Column
+from bmrblib.pystarlib.TagTable import TagTable
+
+
+class AllChecks(TestCase):
+    def testcolumn(self):
+        """Column access"""
+        values = ['1', 'H5\'', '', 'a b', 'é']
+        column = Column(values)
+        self.assertEqual(len(column), 5)
+        self.assertEqual(column[1], 'H5\'')
+        self.assertEqual(column[2], '')
+        self.assertEqual(column[-1], 'é')
+        self.assertEqual(column[1:4], values[1:4])
+        self.assertEqual(list(column), values)
+        self.assertEqual(column, values)
+        self.assertNotEqual(column, values[:-1])
+        self.assertTrue('a b' in column)
+        self.assertEqual(column.index('a b'), 3)
+        self.assertRaises(IndexError, column.__getitem__, 5)
+        self.assertEqual(Column([]), [])
+
+    def testcolumns_compact(self):
+        """TagTable columns_compact and columns_expand"""
+        tT = TagTable(free=None, tagnames=['_A.a', '_A.b'], tagvalues=[['1', '2'], ["x y", 'z']])
+        text = tT.star_text()
+        tT.columns_compact()
+        self.assertTrue(isinstance(tT.tagvalues[0], Column))
+        self.assertEqual(tT.tagvalues, [['1', '2'], ["x y", 'z']])
+        self.assertEqual(tT.star_text(), text)
+        self.assertFalse(tT.check_integrity())
+        tT.columns_expand()
+        self.assertTrue(isinstance(tT.tagvalues[0], list))
+        self.assertEqual(tT.star_text(), text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@ Classes for dealing with STAR syntax
 from bmrblib.pystarlib import Utils
 from bmrblib.pystarlib.Utils import Lister
 from bmrblib.pystarlib.TagTable import TagTable
+from bmrblib.pystarlib.Column import Column
 from bmrblib.pystarlib.Text import comments_strip
 from bmrblib.pystarlib.Text import semicolon_block_collapse
 from bmrblib.pystarlib.Text import nmrView_compress
@@ -14,8 +15,30 @@ from bmrblib.pystarlib.Text import pattern_save_begin_nws
 from bmrblib.pystarlib.Text import pattern_save_end_nws
 from bmrblib.pystarlib.Text import pattern_tag_name_nws
 from bmrblib.pystarlib.Text import pattern_tagtable_loop_nws
+from bmrblib.pystarlib.Text import pattern_semicolon_line_begin
+from bmrblib.pystarlib.Text import pattern_save_end_2
+from bmrblib.pystarlib.Text import pattern_tag_name
+from bmrblib.pystarlib.Text import pattern_unquoted_find
+from bmrblib.pystarlib.Text import StructureIndex
+from bmrblib.pystarlib.Text import tag_value_parse
 from bmrblib.pystarlib.SaveFrame import SaveFrame
+from bmrblib.pystarlib.SaveFrame import possibleTagNamesSFCategory
+from bmrblib.pystarlib.SaveFrameIndex import SaveFrameIndex
+from bmrblib.pystarlib.Tokenizer import tokenize
+from bmrblib.pystarlib.Tokenizer import TOKEN_DATA
+from bmrblib.pystarlib.Tokenizer import TOKEN_SAVE_BEGIN
+from bmrblib.pystarlib.Tokenizer import TOKEN_SAVE_END
+from bmrblib.pystarlib.Tokenizer import TOKEN_LOOP
+from bmrblib.pystarlib.Tokenizer import TOKEN_STOP
+from bmrblib.pystarlib.Tokenizer import TOKEN_TAG
+from bmrblib.pystarlib.Tokenizer import TOKEN_VALUE
+from bmrblib.pystarlib.Tokenizer import TOKEN_VALUES
+from bmrblib.pystarlib.Tokenizer import TOKEN_ERROR
 
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+import io
+import mmap
 import os
 import re
 #import profile
@@ -26,10 +49,134 @@ ___date__     = "$Date: 2007-08-22 20:59:28 +0200 (Wed, 22 Aug 2007) $"
 
 
 
+"""
+List of the datanodes of a STAR file with an index of the saveframes by
+their category tag (_Saveframe_category or .Sf_category in the first
+tagtable) and its value.
+The index is kept up to date incrementally: datanodes that were appended
+or extended are indexed at the next lookup, any other change to the list
+makes the index be rebuilt at the next lookup. Changes to the first
+tagtable of a saveframe after it was indexed are not seen.
+"""
+class DataNodeList (list):
+    def __init__(self, datanodes = ()):
+        list.__init__(self, datanodes)
+        self._index_reset()
+
+    def _index_reset(self):
+        self._category_index = {}
+        self._indexed_count = 0
+
+    """
+    Indexes the datanodes added since the last lookup.
+    """
+    def _index_update(self):
+        if self._indexed_count > len(self):
+            self._index_reset()
+        for datanode in self[self._indexed_count:]:
+            if not isinstance(datanode, SaveFrame) or not datanode.tagtables:
+                continue
+            tt = datanode.tagtables[0]
+            keys = set()
+            for tagname, values in zip(tt.tagnames, tt.tagvalues):
+                if tagname.endswith(possibleTagNamesSFCategory) and len(values):
+                    keys.add((tagname, values[0]))
+            for key in keys:
+                self._category_index.setdefault(key, []).append(datanode)
+        self._indexed_count = len(self)
+
+    """
+    Returns the list of saveframes with the category tag of the given name
+    in their first tagtable having the given value, in the order of the
+    datanodes. The tag name should end with one of the category tag names.
+    """
+    def category_datanodes(self, tagname, category):
+        self._index_update()
+        return list(self._category_index.get((tagname, category), ()))
+
+    ## Any change other than adding at the end rebuilds the index
+    def __setitem__(self, *args):
+        self._index_reset()
+        return list.__setitem__(self, *args)
+
+    def __delitem__(self, *args):
+        self._index_reset()
+        return list.__delitem__(self, *args)
+
+    def __imul__(self, *args):
+        self._index_reset()
+        return list.__imul__(self, *args)
+
+    def insert(self, *args):
+        self._index_reset()
+        return list.insert(self, *args)
+
+    def remove(self, *args):
+        self._index_reset()
+        return list.remove(self, *args)
+
+    def pop(self, *args):
+        self._index_reset()
+        return list.pop(self, *args)
+
+    def clear(self):
+        self._index_reset()
+        return list.clear(self)
+
+    def sort(self, *args, **kwargs):
+        self._index_reset()
+        return list.sort(self, *args, **kwargs)
+
+    def reverse(self):
+        self._index_reset()
+        return list.reverse(self)
+
+
+"""
+Parses the part of a file at offset with the given length and returns the
+status of File.parse, the title and the list of datanodes. Parts not at
+the start of the file get a dummy data_ title. This is run in the worker
+processes of File._parallel_parse; with the engine 'mmap' the bytes of
+the part are given to the tokenizer.
+The part should hold saveframes_count saveframes after the category
+filter according to the saveframe index. A parse that succeeds with
+another number of saveframes, e.g. when the regex engine passes over a
+broken saveframe, raises a ValueError.
+"""
+def region_parse(filename, offset, length, saveframes_count, engine, categories, nmrView_type, columnar, verbosity):
+    with open(filename, 'rb') as fileobj:
+        fileobj.seek(offset)
+        text = fileobj.read(length)
+    if offset:
+        text = b'data_part\n' + text
+    if engine == 'mmap':
+        engine = 'tokenizer'
+    else:
+        text = text.decode()
+    region_file = File(filename = filename, verbosity = verbosity, columnar = columnar)
+    status = region_file.parse(text = text, nmrView_type = nmrView_type,
+                               engine = engine, categories = categories)
+    if not status:
+        count = len([ datanode for datanode in region_file.datanodes
+                      if isinstance(datanode, SaveFrame) ])
+        if count != saveframes_count:
+            raise ValueError('Parsed %s saveframes instead of the %s indexed in the part at offset %s of file: %s' % (
+                count, saveframes_count, offset, filename))
+    return status, region_file.title, list(region_file.datanodes)
+
+
 """
 STAR file
 Only methods for reading and writing are currently implemented.
-datanodes is a list of possibly mixed saveframes and tagtables
+datanodes is a list of possibly mixed saveframes and tagtables; it is kept
+as a DataNodeList so the saveframes can be looked up by category
+With columnar set the values of the looped tagtables that are read are
+kept as Column objects (see Column.py) instead of lists, which takes a lot
+less memory for big loops. Columns can not be changed in place.
+With cache set to a ParseCache (see ParseCache.py) read loads the
+datanodes of a file that was parsed before from the cache and stores
+those of a file that was not. The entries of the cache are pickles, so
+only a cache directory that no untrusted user can write to may be used.
 """
 class File (Lister):
     def __init__(self, 
@@ -38,18 +185,22 @@ class File (Lister):
                     datanodes               = None, 
                     flavor                  = None, # Call set_flavor when changing
 #                    preferred_quote         = '"', # Put somewhere else?
-                    verbosity   = 2
+                    verbosity   = 2,
+                    columnar    = False,
+                    cache       = None
                   ):
         self.title      = title
         self.filename   = filename
         
         if datanodes:
-          self.datanodes  = datanodes
+          self.datanodes  = DataNodeList(datanodes)
         else:
-          self.datanodes = []
+          self.datanodes = DataNodeList()
           
         self.flavor     = flavor
         self.verbosity  = verbosity
+        self.columnar   = columnar
+        self.cache      = cache
         
     "Simple checks on integrity"
     def check_integrity(self, recursive = 1):
@@ -64,46 +215,196 @@ class File (Lister):
 
     "Returns the STAR text representation"
     def star_text(self, flavor = None):
+        text = io.StringIO()
+        if self.write_to(text, flavor = flavor):
+            return 1
+        return text.getvalue()
+
+    """
+    Writes the STAR text representation to the file object datanode by
+    datanode so that the text of the whole file is never made.
+    Returns status (None for success, 1 for failure)
+    """
+    def write_to(self, fileobj, flavor = None):
         if flavor == None:
             flavor = self.flavor
-        str = 'data_%s\n' % self.title
+        fileobj.write('data_%s\n' % self.title)
         # Data node objects can be of type SaveFrame OR TagTable only
         # Data node object can now also contain comment information
         #      these comments are printed before the saveframe (Wim 2003/08/05)
         for datanode in self.datanodes:
-            str = str + datanode.comment
-            str = str + datanode.star_text(flavor = flavor)
-        return str
+            fileobj.write(getattr(datanode, 'comment', ''))
+            if datanode.write_to(fileobj, flavor = flavor):
+                print('ERROR: could not write datanode:', datanode.title)
+                return 1
+        return None
 
 
     """
     Reads a NMR-STAR formatted file using
     the filename attribute.
+    See parse for the engine and categories arguments.
+    With the engine 'mmap' the file is not read into memory but mapped and
+    the tokenizer scans the mapped bytes; only the tag names and values are
+    decoded (as UTF-8). This allows for files larger than the memory.
+    With more than one worker the file is split at saveframe boundaries
+    and the parts are parsed in a pool of that many processes, see
+    _parallel_parse.
+    The cache attribute is used when set.
     """
-    def read (self, nmrView_type = 0):
+    def read (self, nmrView_type = 0, engine = 'regex', categories = None, workers = None):
 
         if not self.filename:
             print('ERROR: no filename in STARFile with title:', self.title)
             return 1
 #        print "DEBUG: Current directory", os.listdir(os.curdir)
-        text = open(self.filename, 'r').read()
-        if self.parse(text=text, nmrView_type = nmrView_type):
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(self.filename, engine = engine, nmrView_type = nmrView_type,
+                                       categories = categories, columnar = self.columnar)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                if self.verbosity >= 9:
+                    print('Loaded the parsed file from the cache:', self.filename)
+                self.title = cached[0]
+                self.datanodes.extend(cached[1])
+                return 0
+        datanodes_count = len(self.datanodes)
+        if workers and workers > 1:
+            status = self._parallel_parse(workers, nmrView_type = nmrView_type,
+                                          engine = engine, categories = categories)
+        elif engine == 'mmap':
+            status = self._mmap_parse(nmrView_type = nmrView_type, categories = categories)
+        else:
+            text = open(self.filename, 'r').read()
+            status = self.parse(text=text, nmrView_type = nmrView_type, engine = engine,
+                                categories = categories)
+        if status:
             print("ERROR: couldn't parse file")
             return 1
-         
+        if cache_key:
+            self.cache.put(cache_key, self.title, self.datanodes[datanodes_count:])
+        return 0
+
+
+    """
+    Parses the file with the filename attribute in a pool of worker
+    processes. The saveframe boundaries are found by the scan of
+    SaveFrameIndex (using the sidecar file when it is current, without
+    writing one) and the file is split at saveframe begins into parts of
+    about equal size, a few per worker. Each worker reads and parses its
+    part with region_parse; the datanodes are added in the order of the
+    file. Returns 0 on success and 1 on error. A part parsed without an
+    error but not into the saveframes of the index raises a ValueError.
+    """
+    def _parallel_parse(self, workers, nmrView_type = 0, engine = 'regex', categories = None):
+        index = SaveFrameIndex(filename = self.filename, verbosity = self.verbosity)
+        if (index.read() or not index.is_current()) and index.build():
+            return 1
+
+        ## Split at the saveframe begins, the first part has the data_ title
+        parts_count = workers * 4
+        step        = index.size // parts_count + 1
+        offsets     = [ 0 ]
+        for sf_title, category, offset, length in index.saveframes:
+            if offset >= offsets[-1] + step:
+                offsets.append(offset)
+        lengths = [ end - begin for begin, end in zip(offsets, offsets[1:] + [ index.size ]) ]
+
+        ## The number of saveframes kept in each part
+        counts = [ 0 ] * len(offsets)
+        part = 0
+        for sf_title, category, offset, length in index.saveframes:
+            while part + 1 < len(offsets) and offset >= offsets[part + 1]:
+                part += 1
+            if categories is None or category is None or category in categories:
+                counts[part] += 1
+        if self.verbosity >= 9:
+            print('Parsing the file in %s parts with %s workers' % (len(offsets), workers))
+
+        executor = ProcessPoolExecutor(max_workers = workers)
+        try:
+            results = executor.map(region_parse,
+                                   [ self.filename ] * len(offsets), offsets, lengths, counts,
+                                   [ engine ] * len(offsets),
+                                   [ categories ] * len(offsets),
+                                   [ nmrView_type ] * len(offsets),
+                                   [ self.columnar ] * len(offsets),
+                                   [ self.verbosity ] * len(offsets))
+            for part, ( status, title, datanodes ) in enumerate(results):
+                if status:
+                    print('ERROR: could not parse the part at offset %s of file: %s' % (offsets[part], self.filename))
+                    return 1
+                if not part:
+                    self.title = title
+                self.datanodes.extend(datanodes)
+        finally:
+            executor.shutdown(wait = True, cancel_futures = True)
         return 0
 
+
+    """
+    Parses the memory mapped file with the filename attribute using the
+    tokenizer, which hands the runs of unquoted values to the parser in
+    bulk (see Tokenizer.py). Returns 0 on success and 1 on error.
+    """
+    def _mmap_parse(self, nmrView_type = 0, categories = None):
+        fileobj = open(self.filename, 'rb')
+        try:
+            ## An empty file can not be mapped
+            if not os.fstat(fileobj.fileno()).st_size:
+                return self.parse(text = b'', nmrView_type = nmrView_type,
+                                  engine = 'tokenizer', categories = categories)
+            data = mmap.mmap(fileobj.fileno(), 0, access = mmap.ACCESS_READ)
+            try:
+                ## The tokenizer reads the pages once from start to end
+                if getattr(mmap, 'MADV_SEQUENTIAL', None) is not None:
+                    data.madvise(mmap.MADV_SEQUENTIAL)
+                return self.parse(text = data, nmrView_type = nmrView_type,
+                                  engine = 'tokenizer', categories = categories)
+            finally:
+                data.close()
+        finally:
+            fileobj.close()
+
     
     """
     - Parses text into save frames and tagtables.
     - Input text should start at position given with non-white space character
     - Appends a list of datanodes(save frames or tagtables)
+    - The engine can be 'regex' for the original parser working on
+    preprocessed text or 'tokenizer' for the single pass tokenizer that
+    works on the raw text. The tokenizer also takes the text as bytes or a
+    memory mapped file. The engines do not always build the same datanodes:
+    the regex engine passes over much text that is not valid STAR without
+    an error where the tokenizer fails, and it splits a quoted loop value at
+    the start of a line following unquoted values where the tokenizer does
+    not. Results of the one engine should not be used for the other.
+    - When a list of saveframe categories is given only the saveframes with
+    one of these categories are kept. The category is the value of the first
+    tag of a saveframe (_Saveframe_category or .Sf_category); the other
+    saveframes are skipped up to their save_ without building tagtables.
+    Saveframes not starting with a category tag and top level tagtables are
+    always kept.
     """
-    def parse (self, text='', nmrView_type = 0):
+    def parse (self, text='', nmrView_type = 0, engine = 'regex', categories = None):
 
         if self.verbosity > 2:        
             print('DEBUG: Parsing STAR file:', self.filename)
 
+        if engine == 'tokenizer':
+            ## For nmrView 'nmrStar' also compress {  } into {}
+            if nmrView_type:
+                if not isinstance(text, str):
+                    print('ERROR: nmrView type files can only be parsed from text')
+                    return 1
+                text = nmrView_compress(text)
+            return self._tokens_parse(tokenize(text, runs = True), categories = categories)
+        if engine != 'regex':
+            print('ERROR: Unknown parse engine given', engine)
+            return 1
+
         """
         '"Begin at the beginning," the King said, gravely,
         "and go on till you come to the end; then stop."' (LC)
@@ -140,6 +441,7 @@ class File (Lister):
         next_loop_tt    = None      # LOOP TAGTABLE
         sf_open         = None      # When a saveframe is open
         text_length     = len(text)
+        structure_index = None      # Made for the first looped tagtable
 
         ## Only break when parsed to the eof
         while pos < text_length:
@@ -195,6 +497,12 @@ class File (Lister):
                 if match_save_begin.start() != pos:
                     print("ERROR: Code error (wrong second match on sf begin)");
                     return None
+                if categories is not None:
+                    pos_sf_end = self._saveframe_skip(text, match_save_begin.end(), categories)
+                    if pos_sf_end is not None:
+                        next_sf_begin   = None
+                        pos             = pos_sf_end
+                        continue
                 self.datanodes.append(SaveFrame(tagtables    = [])) # Need resetting ?
                 self.datanodes[-1].title = match_save_begin.group(1)
                 sf_open         = 1
@@ -240,6 +548,10 @@ class File (Lister):
                     return None
                 pos = match_tagtable_loop.end()
 
+                ## Index the ends of all looped tagtables in one go
+                if structure_index == None:
+                    structure_index = StructureIndex(text)
+
             if sf_open:
                 dn = self.datanodes[-1].tagtables # Insert in last saveframes' tagtables
             else:
@@ -251,11 +563,13 @@ class File (Lister):
                                 tagvalues = [], 
                                 verbosity = self.verbosity))
             tt = dn[-1] # Just to be verbose for the beloved reader
-            pos = tt.parse(text=text, pos=pos)
+            pos = tt.parse(text=text, pos=pos, structure_index=structure_index)
             
             if pos ==  None:
                 print("ERROR: In parsing tagtable")
                 return None
+            if self.columnar:
+                tt.columns_compact()
             if self.verbosity >=9:                
                 print('Parsed tagtable up to pos: [%s]' % pos)
             
@@ -273,6 +587,343 @@ class File (Lister):
 
 
 
+    """
+    Checks the category of the saveframe with its first tag starting at
+    position pos of the preprocessed text.
+    Returns the position after the save_ ending the saveframe when the
+    category is not one of the given categories, otherwise None.
+    """
+    def _saveframe_skip(self, text, pos, categories):
+        match_tag_name = pattern_tag_name.match(text, pos)
+        if not match_tag_name:
+            return None
+        if not match_tag_name.group(1).endswith(possibleTagNamesSFCategory):
+            return None
+        value, pos_value = tag_value_parse(text, match_tag_name.end())
+        if value is None or value in categories:
+            return None
+        ## The white space before the save_ might have been eaten already
+        pos_sf_end = pattern_unquoted_find(text, pattern_save_end_2, pos_value - 1)
+        if pos_sf_end == -1:
+            return len(text)
+        return pattern_save_end.match(text, pos_sf_end + 1).end()
+
+
+    """
+    Builds the datanodes from the tokens of the tokenizer.
+    Returns 0 on success and 1 on error.
+    See parse for the categories argument.
+    """
+    def _tokens_parse(self, tokens, categories = None):
+
+        nodes = self._datanodes_build(tokens, categories = categories)
+        while True:
+            try:
+                datanode = next(nodes)
+            except StopIteration as stop:
+                status = stop.value
+                break
+            self.datanodes.append(datanode)
+        if status:
+            return 1
+
+        if self.verbosity > 2:
+            print('DEBUG Parsed: [%s] datanodes (top level count only)' % \
+                  len(self.datanodes))
+
+        if self.check_integrity(recursive = 0):
+            print("ERROR: integrity not ok")
+            return 1
+        return 0
+
+
+    """
+    Generator over the datanodes built from the tokens of the tokenizer.
+    Each saveframe or top level tagtable is yielded as soon as it is
+    complete. The tree is the same as the one the regex engine builds: a
+    free tagtable collects consecutive tag/value pairs, a looped tagtable
+    ends at a stop_, a loop_, a tag name or a save frame boundary.
+    The runs of unquoted values (TOKEN_VALUES) are split here and added to
+    the values of a looped tagtable in one go.
+    Saveframes with a category not in the list of categories given are
+    passed over up to their save_ without building them.
+    The return value of the generator is 0 on success and 1 on error.
+    """
+    def _datanodes_build(self, tokens, categories = None):
+
+        ## Skipping saveframes takes tokens from the same iterator. The
+        ## tokenizer can also be told to jump to the end of the saveframe.
+        tokens = iter(tokens)
+        skip_send = getattr(tokens, 'send', None)
+
+        ## TITLE
+        for token_type, token in tokens:
+            if token_type != TOKEN_DATA:
+                print("ERROR: found no 'data_title' string as first item but: [%s]" % token)
+                return 1
+            self.title = token[5:]
+            break
+        else:
+            print("ERROR: found no 'data_title' string in text")
+            return 1
+
+        sf              = None              # Open saveframe
+        tt              = None              # Current tagtable
+        tt_free_open    = None              # Free tagtable taking more tags
+        tag_value_next  = None              # Free tag waiting for its value
+        loop_tags_open  = None              # Looped tagtable taking tag names
+        loop_values     = None              # Values of an open looped tagtable
+
+        for token_type, token in tokens:
+            if loop_values is not None:
+                if token_type == TOKEN_VALUES:
+                    loop_values.extend(token.split())
+                    continue
+                if token_type == TOKEN_VALUE:
+                    loop_values.append(token)
+                    continue
+                if self._loop_values_distribute(tt, loop_values):
+                    return 1
+                loop_values = None
+                tt.set_title()
+                if sf is None:
+                    yield tt
+                if token_type == TOKEN_STOP:
+                    continue
+
+            elif tag_value_next:
+                if token_type == TOKEN_ERROR:
+                    return 1
+                ## Any word is accepted as the value like in tag_value_parse;
+                ## more values in a run are left over
+                values_left = None
+                if token_type == TOKEN_VALUES:
+                    values_left = token.split()
+                    token = values_left.pop(0)
+                tt.tagvalues.append([token])
+                tag_value_next = None
+                if (categories is not None and sf is not None and
+                        len(sf.tagtables) == 1 and len(tt.tagnames) == 1 and
+                        tt.tagnames[0].endswith(possibleTagNamesSFCategory) and
+                        token not in categories):
+                    sf              = None
+                    tt_free_open    = None
+                    if skip_send is not None:
+                        try:
+                            skip_send(TOKEN_SAVE_END)
+                        except StopIteration:
+                            break
+                        continue
+                    for token_type, token in tokens:
+                        if token_type == TOKEN_SAVE_END:
+                            break
+                        if token_type == TOKEN_ERROR:
+                            return 1
+                    continue
+                if not values_left:
+                    continue
+                print('ERROR: No new item found in data_nodes_parse.')
+                print('Items looked for are a begin or end of a saveframe, or')
+                print('a begin of a tagtable(free or looped).')
+                print('Found instead: [%s]' % values_left[0])
+                return 1
+
+            elif loop_tags_open:
+                if token_type == TOKEN_TAG:
+                    tt.tagnames.append(token)
+                    continue
+                if token_type == TOKEN_VALUES:
+                    loop_values = token.split()
+                elif token_type == TOKEN_VALUE:
+                    loop_values = [token]
+                else:
+                    print("ERROR: No tag values found for looped tagtable")
+                    return 1
+                loop_tags_open  = None
+                continue
+
+            ## FREE TAGTABLE
+            if token_type == TOKEN_TAG:
+                if not tt_free_open:
+                    tt = TagTable(free      = 1,
+                                  tagnames  = [],
+                                  tagvalues = [],
+                                  verbosity = self.verbosity)
+                    if sf is not None:
+                        sf.tagtables.append(tt)
+                    tt_free_open = 1
+                tt.tagnames.append(token)
+                tag_value_next = 1
+                continue
+
+            if tt_free_open:
+                tt.set_title()
+                if sf is None:
+                    yield tt
+                tt_free_open = None
+
+            ## LOOP TAGTABLE
+            if token_type == TOKEN_LOOP:
+                tt = TagTable(free      = None,
+                              tagnames  = [],
+                              tagvalues = [],
+                              verbosity = self.verbosity)
+                if sf is not None:
+                    sf.tagtables.append(tt)
+                loop_tags_open = 1
+
+            ## SAVE FRAME BEGIN
+            elif token_type == TOKEN_SAVE_BEGIN:
+                if sf is not None:
+                    print("ERROR: Found the beginning of a saveframe but")
+                    print("ERROR: saveframe before is still open(not closed;-)")
+                    return 1
+                sf = SaveFrame(tagtables    = [])
+                sf.title = token[5:]
+
+            ## SAVE FRAME END
+            elif token_type == TOKEN_SAVE_END:
+                if sf is None:
+                    print("ERROR: Found the end of a saveframe but")
+                    print("ERROR: saveframe was not open")
+                    return 1
+                yield sf
+                sf = None
+
+            elif token_type == TOKEN_ERROR:
+                return 1
+
+            else:
+                print('ERROR: No new item found in data_nodes_parse.')
+                print('Items looked for are a begin or end of a saveframe, or')
+                print('a begin of a tagtable(free or looped).')
+                print('Found instead: [%s]' % token)
+                return 1
+
+        if loop_values is not None:
+            if self._loop_values_distribute(tt, loop_values):
+                return 1
+            tt.set_title()
+            if sf is None:
+                yield tt
+        if tag_value_next:
+            print("ERROR: No value found for tag:", tt.tagnames[-1])
+            return 1
+        if loop_tags_open:
+            print("ERROR: No tag values found for looped tagtable")
+            return 1
+        if tt_free_open:
+            tt.set_title()
+            if sf is None:
+                yield tt
+
+        ## A saveframe that is not closed at the end of the text is kept
+        if sf is not None:
+            yield sf
+        return 0
+
+
+    """
+    Distributes the values of a looped tagtable over its columns.
+    Returns status (None for success, 1 for failure)
+    """
+    def _loop_values_distribute(self, tt, values):
+        names_length = len(tt.tagnames)
+        if len(values) % names_length:
+            print("ERROR: not correct number of tag values read")
+            print("Read [%s] tag(s) for [%s] tag names." % (
+                len(values), names_length))
+            print("Tag names of this table are:")
+            print(tt.tagnames)
+            return 1
+        if self.columnar:
+            tt.tagvalues = [Column(values[i::names_length]) for i in range(names_length)]
+        else:
+            tt.tagvalues = [values[i::names_length] for i in range(names_length)]
+        return None
+
+
+    """
+    Generator over the datanodes of a STAR file without keeping them.
+    The file is read in chunks of chunk_size characters and each saveframe
+    or top level tagtable is yielded as soon as it is parsed, so the memory
+    used depends on the largest saveframe and not on the size of the file.
+    The datanodes are not added to this object; the title is set.
+    The argument can be a file name or an opened file; without it the
+    filename attribute is used. Quoted values may not span lines here.
+    On a parse error the error is printed and the iteration stops.
+    See parse for the categories argument.
+    """
+    def iter_datanodes(self, path_or_fileobj = None, chunk_size = 1048576,
+                       categories = None):
+
+        if path_or_fileobj is None:
+            path_or_fileobj = self.filename
+        if not path_or_fileobj:
+            print('ERROR: no filename in STARFile with title:', self.title)
+            return
+
+        if isinstance(path_or_fileobj, str):
+            fileobj = open(path_or_fileobj, 'r')
+        else:
+            fileobj = path_or_fileobj
+
+        try:
+            tokens = chain.from_iterable(
+                tokenize(piece, runs = True) for piece in self._text_pieces_read(fileobj, chunk_size))
+            status = yield from self._datanodes_build(tokens, categories = categories)
+            if status:
+                print("ERROR: couldn't parse file")
+        finally:
+            if fileobj is not path_or_fileobj:
+                fileobj.close()
+
+
+    """
+    Generator over pieces of the text in the file object that end on a line
+    boundary outside of any semicolon block so that each can be tokenized
+    on its own.
+    """
+    def _text_pieces_read(self, fileobj, chunk_size):
+
+        rest = ''
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                if rest:
+                    yield rest
+                return
+            text = rest + chunk
+
+            ## Each semicolon at the beginning of a line opens or closes a
+            ## block. The text always starts at the beginning of a line.
+            block_begin = None
+            if text.startswith(';'):
+                block_begin = 0
+            block_last_begin = 0
+            block_last_end = 0
+            for match in pattern_semicolon_line_begin.finditer(text):
+                if block_begin is None:
+                    block_begin = match.start() + 1
+                else:
+                    block_last_begin = block_begin
+                    block_last_end = match.end()
+                    block_begin = None
+
+            if block_begin is not None:
+                cut = block_begin
+            else:
+                cut = max(text.rfind('\n'), text.rfind('\r')) + 1
+                if cut < block_last_end:
+                    cut = block_last_begin
+
+            if cut <= 0:
+                rest = text
+                continue
+            yield text[:cut]
+            rest = text[cut:]
+
+
     """
     Writes the object to a STAR formatted file using
     the filename attribute.
@@ -285,12 +936,18 @@ class File (Lister):
         # A file path to open.
         if isinstance(self.filename, str):
             f = open(self.filename, 'w')
-            f.write(self.star_text())
-            f.close()
+            try:
+                status = self.write_to(f)
+            finally:
+                f.close()
 
         # An already opened file handle.
         else:
-            self.filename.write(self.star_text())
+            status = self.write_to(self.filename)
+
+        if status:
+            print('ERROR: could not write STAR file:', self.filename)
+            return 1
 
         if self.verbosity > 2:
             print('DEBUG: Written STAR file:', self.filename)
@@ -337,10 +994,24 @@ class File (Lister):
     """
     Returns sfs that match the category, None for error and empty list
     for no matches.
+    With from_file set the sfs are not taken from the datanodes but read
+    from the file with the filename attribute using the saveframe index;
+    see load_saveframe.
     """
-    def getSaveFrames(self, category = None):
+    def getSaveFrames(self, category = None, from_file = False, engine = 'regex'):
         if not category:
             return None
+        if from_file:
+            index = self._saveframe_index_load()
+            if index is None:
+                return None
+            result = []
+            for offset, length in index.category_regions(category):
+                sf = self._saveframe_region_parse(index, offset, length, engine)
+                if sf is None:
+                    return None
+                result.append(sf)
+            return result
         result = []
         for node in self.datanodes:
             if isinstance(node, SaveFrame): # redundant test for well behaved files
@@ -349,6 +1020,53 @@ class File (Lister):
         return result
 
 
+
+    """
+    Returns the saveframe with the title read from the file with the
+    filename attribute or None on error. Only the region of the file with the
+    saveframe is read and parsed. The regions are looked up in a saveframe
+    index kept next to the file (see SaveFrameIndex) that is made when it
+    is missing or when the file changed. The saveframe is not added to the
+    datanodes. See parse for the engine argument.
+    """
+    def load_saveframe(self, title, engine = 'regex'):
+        index = self._saveframe_index_load()
+        if index is None:
+            return None
+        region = index.title_region(title)
+        if region is None:
+            print('ERROR: no saveframe with title [%s] in file: %s' % (title, self.filename))
+            return None
+        return self._saveframe_region_parse(index, region[0], region[1], engine)
+
+    """
+    Returns the current saveframe index of the file with the filename
+    attribute or None on error.
+    """
+    def _saveframe_index_load(self):
+        if not self.filename or not isinstance(self.filename, str):
+            print('ERROR: no filename in STARFile with title:', self.title)
+            return None
+        index = SaveFrameIndex(filename = self.filename, verbosity = self.verbosity)
+        if index.load():
+            return None
+        return index
+
+    """
+    Returns the saveframe parsed from the region of the indexed file or None
+    on error.
+    """
+    def _saveframe_region_parse(self, index, offset, length, engine):
+        text = 'data_%s\n%s\n' % (self.title, index.region_read(offset, length))
+        region_file = File(verbosity = self.verbosity, columnar = self.columnar)
+        if region_file.parse(text = text, engine = engine):
+            print('ERROR: could not parse saveframe at offset %s in file: %s' % (offset, self.filename))
+            return None
+        if len(region_file.datanodes) != 1 or not isinstance(region_file.datanodes[0], SaveFrame):
+            print('ERROR: no single saveframe at offset %s in file: %s' % (offset, self.filename))
+            return None
+        return region_file.datanodes[0]
+
         
     """
     Tries to reformat a file on disk with the filename given in the
@@ -1,11 +1,16 @@
 """Unit test
 """
 from bmrblib.pystarlib.File import File
+from bmrblib.pystarlib.File import region_parse
+from bmrblib.pystarlib.SaveFrameIndex import SaveFrameIndex
+from bmrblib.pystarlib.Column import Column
 from bmrblib.pystarlib import Utils
 
 import __init__
 
+import io
 import os   
+import tempfile
 import zipfile
 import urllib.request, urllib.parse, urllib.error
 from unittest import TestCase
@@ -59,6 +64,257 @@ save_comment   _Saveframe_category  comment   loop_
 """
             self.assertTrue(Utils.equalIgnoringWhiteSpace(exp, st))
 
+        def testparse_tokenizer(self):
+            """STAR parse with the tokenizer engine"""
+            text = """data_tokens
+# comment
+save_comment
+   _Saveframe_category  comment # comment
+   _Details
+;
+a block # not a comment
+;
+   loop_
+        _comment
+        _every_flag
+
+'#It has very upfield-shifted H5', H5" @ 3.935,4.012 ppm'  "a b"
+H5' x#y
+     stop_
+save_
+"""
+            strf_regex     = File(verbosity=2)
+            strf_tokenizer = File(verbosity=2)
+            self.assertFalse(strf_regex.parse(text=text))
+            self.assertFalse(strf_tokenizer.parse(text=text, engine='tokenizer'))
+            self.assertEqual(strf_regex.star_text(), strf_tokenizer.star_text())
+
+            for text_eol in (text.replace('\n', '\r\n'), text.replace('\n', '\r')):
+                strf_eol = File(verbosity=2)
+                self.assertFalse(strf_eol.parse(text=text_eol, engine='tokenizer'))
+                self.assertEqual(strf_regex.star_text(), strf_eol.star_text())
+
+        def testparse_columnar(self):
+            """STAR File parse into columns"""
+            text = """data_columns
+save_first
+   _Entry.Sf_category  entry
+   loop_
+        _Author.Name
+        _Author.Note
+'Smith J' ?
+"O'Neil" 'x y'
+     stop_
+save_
+"""
+            for engine in ('regex', 'tokenizer'):
+                strf = File(verbosity=2)
+                self.assertFalse(strf.parse(text=text, engine=engine))
+                strf_columns = File(verbosity=2, columnar=True)
+                self.assertFalse(strf_columns.parse(text=text, engine=engine))
+                self.assertEqual(strf.star_text(), strf_columns.star_text())
+                self.assertTrue(isinstance(strf_columns.datanodes[0].tagtables[1].tagvalues[0], Column))
+                self.assertEqual(strf_columns.datanodes[0].tagtables[1].tagvalues[1], ['?', 'x y'])
+
+        def testiter_datanodes(self):
+            """STAR File iter_datanodes"""
+            text = """data_stream
+save_first
+   _Entry.Sf_category  entry
+   _Entry.Details
+;
+save_
+;
+   loop_
+        _Author.Name
+        _Author.Note
+'Smith J' ?
+"O'Neil" 'x y'
+     stop_
+save_
+
+save_second
+   _Entry.Sf_category  other
+save_
+"""
+            strf = File(verbosity=2)
+            self.assertFalse(strf.parse(text=text, engine='tokenizer'))
+            for chunk_size in (1, 5, 100000):
+                strf_stream = File(verbosity=2)
+                datanodes = list(strf_stream.iter_datanodes(io.StringIO(text), chunk_size=chunk_size))
+                self.assertEqual(strf_stream.title, 'stream')
+                self.assertEqual(len(datanodes), 2)
+                self.assertEqual(strf_stream.datanodes, [])
+                strf_stream.datanodes = datanodes
+                self.assertEqual(strf.star_text(), strf_stream.star_text())
+
+        def testparse_categories(self):
+            """STAR File parse of selected saveframe categories"""
+            text = """data_categories
+save_first
+   _Entry.Sf_category  entry
+   _Entry.Details
+;
+save_
+;
+save_
+
+save_second
+   _Heteronucl_T1_list.Sf_category  heteronucl_T1_relaxation
+   loop_
+        _T1.ID
+        _T1.Val
+1 0.5
+2 'save_ 2'
+     stop_
+save_
+
+save_third
+   _Saveframe_category  S2_parameters
+save_
+"""
+            for engine in ('regex', 'tokenizer'):
+                strf = File(verbosity=2)
+                self.assertFalse(strf.parse(text=text, engine=engine,
+                    categories=['heteronucl_T1_relaxation', 'S2_parameters']))
+                self.assertEqual([sf.title for sf in strf.datanodes], ['second', 'third'])
+                self.assertEqual(strf.datanodes[0].tagtables[1].tagvalues[1], ['0.5', 'save_ 2'])
+                strf = File(verbosity=2)
+                self.assertFalse(strf.parse(text=text, engine=engine, categories=[]))
+                self.assertEqual(strf.datanodes, [])
+            datanodes = list(File(verbosity=2).iter_datanodes(io.StringIO(text),
+                categories=['entry']))
+            self.assertEqual([sf.title for sf in datanodes], ['first'])
+
+        def testread_mmap(self):
+            """STAR File read with the mmap engine"""
+            text = """data_mapped\r
+save_first\r
+   _Entry.Sf_category  entry # comment\r
+   _Entry.Title        'H\u00e9 said "ok"'\r
+   _Entry.Details\r
+;\r
+save_ \u00e9\r
+;\r
+   loop_\r
+        _Author.Name\r
+'Smith J' "O'Neil"\r
+     stop_\r
+save_\r
+"""
+            strf = File(verbosity=2)
+            self.assertFalse(strf.parse(text=text, engine='tokenizer'))
+            handle, filename = tempfile.mkstemp(suffix='.str')
+            try:
+                os.write(handle, text.encode())
+                os.close(handle)
+                strf_mmap = File(filename=filename, verbosity=2)
+                self.assertFalse(strf_mmap.read(engine='mmap'))
+                self.assertEqual(strf_mmap.title, 'mapped')
+                self.assertEqual(strf.star_text(), strf_mmap.star_text())
+                self.assertEqual(strf_mmap.datanodes[0].tagtables[0].tagvalues[1], ['H\u00e9 said "ok"'])
+            finally:
+                os.unlink(filename)
+
+        def testread_workers(self):
+            """STAR File read in parallel parts"""
+            text = ['data_parts\n']
+            for i in range(20):
+                text.append("""
+save_sf_%s
+   _Saveframe_category  test
+   _Title               'frame %s'
+   loop_
+        _Atom_name
+        _Value
+H  %s.0 N  'a b'
+     stop_
+save_
+""" % (i, i, i))
+            handle, filename = tempfile.mkstemp(suffix='.str')
+            try:
+                os.write(handle, ''.join(text).encode())
+                os.close(handle)
+                strf = File(filename=filename, verbosity=2)
+                self.assertFalse(strf.read())
+                for engine in ['regex', 'mmap']:
+                    strf_parts = File(filename=filename, verbosity=2)
+                    self.assertFalse(strf_parts.read(engine=engine, workers=2))
+                    self.assertEqual(strf_parts.title, 'parts')
+                    self.assertEqual(len(strf_parts.datanodes), 20)
+                    self.assertEqual(strf.star_text(), strf_parts.star_text())
+
+                ## A broken saveframe that the regex engine passes over is found
+                with open(filename, 'w') as fileobj:
+                    fileobj.write(''.join(text).replace("'frame 12'", "'frame 12"))
+                strf_broken = File(filename=filename, verbosity=0)
+                self.assertRaises(ValueError, strf_broken.read, workers=2)
+                index = SaveFrameIndex(filename=filename)
+                self.assertFalse(index.build())
+                offset, length = index.title_region('sf_12')
+                self.assertRaises(ValueError, region_parse, filename, offset, index.size - offset,
+                                  8, 'regex', None, 0, False, 0)
+            finally:
+                os.unlink(filename)
+
+        def testwrite_to(self):
+            """STAR File write_to"""
+            text = """data_written
+
+save_first
+   _Entry.Sf_category entry
+   loop_
+      _Author.Name
+      _Author.Note
+
+'Smith J' ?
+"O'Neil" "x y"
+
+   stop_
+
+save_
+"""
+            strf = File(verbosity=2)
+            self.assertFalse(strf.parse(text=text, engine='tokenizer'))
+            out = io.StringIO()
+            self.assertFalse(strf.write_to(out))
+            self.assertEqual(out.getvalue(), strf.star_text())
+            self.assertEqual(out.getvalue(), text.replace("'Smith J' ?", '"Smith J" ? ').replace('"x y"', '"x y" '))
+            strf.filename = out = io.StringIO()
+            self.assertFalse(strf.write())
+            self.assertEqual(out.getvalue(), strf.star_text())
+
+        def testcategory_datanodes(self):
+            """STAR File saveframe lookup by category"""
+            text = """data_categories
+
+save_first
+   _Entry.Sf_category entry
+save_
+
+save_second
+   _Saveframe_category  other
+save_
+
+save_third
+   _Entry.Sf_category entry
+save_
+"""
+            strf = File(verbosity=2)
+            self.assertFalse(strf.parse(text=text, engine='tokenizer'))
+            datanodes = strf.datanodes
+            self.assertEqual([sf.title for sf in datanodes.category_datanodes('_Entry.Sf_category', 'entry')],
+                             ['first', 'third'])
+            self.assertEqual(len(datanodes.category_datanodes('_Saveframe_category', 'other')), 1)
+            self.assertEqual(datanodes.category_datanodes('_Entry.Sf_category', 'other'), [])
+            ## Appended saveframes are indexed at the next lookup
+            datanodes.append(datanodes[1])
+            self.assertEqual(len(datanodes.category_datanodes('_Saveframe_category', 'other')), 2)
+            ## Other changes make the index be rebuilt
+            del datanodes[0]
+            self.assertEqual([sf.title for sf in datanodes.category_datanodes('_Entry.Sf_category', 'entry')],
+                             ['third'])
+
         def testread2(self):
             """STAR File read"""
             testEntry('1edp')
@@ -0,0 +1,185 @@
+"""
+Cache on disk of parsed STAR files
+"""
+from bmrblib.pystarlib.Utils import Lister
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+
+"""
+The cache keeps the datanodes of parsed STAR files in a directory, one
+pickle file per parse, so that a file that was parsed before is loaded
+without going over its text again. An entry is found by a key made from
+the file and the options of the parse. By default the file is identified
+by its absolute path, size and modification time; with the key_type
+'content' it is identified by the SHA-256 hash of its bytes instead, which
+costs reading the file but finds copies of the file too and does not
+depend on the modification time.
+Entries are written under a unique temporary name first and renamed so
+that processes and threads sharing the cache never see a partly written
+entry. Using an entry updates its modification time; when the entries take
+more than max_size bytes the least recently used ones are removed. The
+size of the cache is counted once and then kept up to date with the
+entries written, so the directory is only scanned again when this count
+passes max_size. Entries written by other processes are seen at that scan.
+Loading an entry unpickles it, which can run any code put into the file.
+The cache directory must therefore only be writable by users that are
+trusted: it is made readable and writable by its owner only, and entries
+that are not owned by the current user are not loaded.
+"""
+
+## The extension of the entry files
+cache_extension = '.pickle'
+
+## Version of the layout of the entry files
+cache_format = 1
+
+## The default maximum size of all entries together in bytes
+cache_max_size = 2**30
+
+
+"""
+Cache of parsed STAR files in a directory
+"""
+class ParseCache (Lister):
+    def __init__(self,
+                    directory       = '',
+                    max_size        = cache_max_size,
+                    key_type        = 'stat',
+                    verbosity       = 2
+                  ):
+        self.directory  = directory
+        self.max_size   = max_size
+        self.key_type   = key_type
+        self.verbosity  = verbosity
+        self.size       = None          # Bytes taken by the entries, None when not counted yet
+
+    """
+    Returns the key of the parse of the file with the options or None when
+    the file can not be read. The engine is part of the key as the engines
+    do not always build the same datanodes (see File.parse).
+    """
+    def key(self, filename, engine = 'regex', nmrView_type = 0, categories = None, columnar = False):
+        try:
+            if self.key_type == 'content':
+                file_hash = hashlib.sha256()
+                with open(filename, 'rb') as fileobj:
+                    for block in iter(lambda: fileobj.read(2**20), b''):
+                        file_hash.update(block)
+                file_id = file_hash.hexdigest()
+            else:
+                stat = os.stat(filename)
+                file_id = '%s %s %s' % (os.path.abspath(filename), stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            return None
+        if categories is not None:
+            categories = sorted(categories)
+        options = repr((cache_format, file_id, engine, nmrView_type, categories, bool(columnar)))
+        return hashlib.sha256(options.encode()).hexdigest()
+
+    "Returns the file name of the entry with the key"
+    def entry_filename(self, key):
+        return os.path.join(self.directory, key + cache_extension)
+
+    """
+    Returns the (title, datanodes) of the entry with the key or None when
+    there is no usable entry.
+    """
+    def get(self, key):
+        entry_filename = self.entry_filename(key)
+        try:
+            with open(entry_filename, 'rb') as fileobj:
+                if hasattr(os, 'getuid') and os.fstat(fileobj.fileno()).st_uid != os.getuid():
+                    print('WARNING: Not loading the parse cache entry of another user', entry_filename)
+                    return None
+                content = pickle.load(fileobj)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError):
+            if self.verbosity >= 2:
+                print('WARNING: Could not load the parse cache entry', entry_filename)
+            return None
+        if not isinstance(content, tuple) or len(content) != 3 or content[0] != cache_format:
+            return None
+        ## Mark the entry as recently used
+        try:
+            os.utime(entry_filename)
+        except OSError:
+            pass
+        return content[1], content[2]
+
+    """
+    Writes the entry with the key and removes the least recently used
+    entries when the cache got too big.
+    Returns status (None for success, 1 for failure)
+    """
+    def put(self, key, title, datanodes):
+        entry_filename = self.entry_filename(key)
+        entry_filename_tmp = None
+        try:
+            os.makedirs(self.directory, mode = 0o700, exist_ok = True)
+            handle, entry_filename_tmp = tempfile.mkstemp(
+                dir = self.directory, prefix = key, suffix = '.tmp')
+            with os.fdopen(handle, 'wb') as fileobj:
+                pickle.dump((cache_format, title, list(datanodes)), fileobj,
+                            protocol = pickle.HIGHEST_PROTOCOL)
+                entry_size = fileobj.tell()
+            os.replace(entry_filename_tmp, entry_filename)
+        except OSError:
+            print('WARNING: Could not write the parse cache entry', entry_filename)
+            if entry_filename_tmp:
+                try:
+                    os.unlink(entry_filename_tmp)
+                except OSError:
+                    pass
+            return 1
+        if self.size is None:
+            self.evict()
+        else:
+            self.size += entry_size
+            if self.size > self.max_size:
+                self.evict()
+        return None
+
+    """
+    Removes the least recently used entries until all entries together
+    take no more than max_size bytes, by default the max_size attribute,
+    and counts the size of the cache again. Entries removed by another
+    process in the meantime are skipped.
+    """
+    def evict(self, max_size = None):
+        if max_size is None:
+            max_size = self.max_size
+        entries = []
+        total_size = 0
+        try:
+            with os.scandir(self.directory) as dir_entries:
+                for dir_entry in dir_entries:
+                    if not dir_entry.name.endswith(cache_extension):
+                        continue
+                    try:
+                        stat = dir_entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, dir_entry.path))
+                    total_size += stat.st_size
+        except OSError:
+            return
+        if total_size > max_size:
+            entries.sort()
+            for mtime, size, path in entries:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+                total_size -= size
+                if total_size <= max_size:
+                    break
+        self.size = total_size
+
+    "Removes all entries"
+    def clear(self):
+        self.evict(max_size = -1)
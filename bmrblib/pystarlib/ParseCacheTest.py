@@ -0,0 +1,120 @@
+from unittest import TestCase
+import unittest
+import os
+import shutil
+import tempfile
+import time
+from bmrblib.pystarlib.File import File
+from bmrblib.pystarlib.ParseCache import ParseCache
+
+
+text = """data_cached
+save_first
+   _Entry.Sf_category  entry
+   _Entry.Title        'A title'
+save_
+
+save_second
+   _Heteronucl_T1_list.Sf_category  heteronucl_T1_relaxation
+   loop_
+        _T1.ID
+        _T1.Val
+1 0.5
+2 0.6
+     stop_
+save_
+"""
+
+
+class AllChecks(TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, 'cached.str')
+        self.cache_dir = os.path.join(self.dir, 'cache')
+        open(self.filename, 'w').write(text)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def entries(self):
+        return sorted(os.listdir(self.cache_dir))
+
+    def testread(self):
+        """File read with a ParseCache"""
+        for key_type in ('stat', 'content'):
+            cache = ParseCache(directory=self.cache_dir, key_type=key_type)
+            strf = File(filename=self.filename, cache=cache)
+            self.assertFalse(strf.read())
+            self.assertEqual(len(self.entries()), 1)
+
+            ## The second read loads the entry
+            strf_cached = File(filename=self.filename, cache=cache)
+            self.assertFalse(strf_cached.read())
+            self.assertEqual(len(self.entries()), 1)
+            self.assertEqual(strf_cached.title, 'cached')
+            self.assertEqual(strf_cached.star_text(), strf.star_text())
+            self.assertEqual(len(strf_cached.getSaveFrames('heteronucl_T1_relaxation')), 1)
+
+            ## Other engines and options of the parse are other entries
+            strf_tokenizer = File(filename=self.filename, cache=cache)
+            self.assertFalse(strf_tokenizer.read(engine='tokenizer'))
+            self.assertEqual(len(self.entries()), 2)
+            strf_columnar = File(filename=self.filename, cache=cache, columnar=True)
+            self.assertFalse(strf_columnar.read(categories=['entry']))
+            self.assertEqual(len(strf_columnar.datanodes), 1)
+            self.assertEqual(len(self.entries()), 3)
+
+            ## A changed file is parsed again
+            time.sleep(0.01)
+            open(self.filename, 'w').write(text.replace('0.6', '0.7'))
+            strf_changed = File(filename=self.filename, cache=cache)
+            self.assertFalse(strf_changed.read())
+            self.assertEqual(strf_changed.datanodes[1].tagtables[1].tagvalues[1], ['0.5', '0.7'])
+            self.assertEqual(len(self.entries()), 4)
+
+            cache.clear()
+            self.assertEqual(self.entries(), [])
+            open(self.filename, 'w').write(text)
+
+    def testevict(self):
+        """ParseCache eviction of the least recently used entries"""
+        cache = ParseCache(directory=self.cache_dir)
+        for i in range(3):
+            cache.put('key%s' % i, 'title%s' % i, [])
+        size = os.path.getsize(cache.entry_filename('key0'))
+        now = time.time()
+        for i in range(3):
+            os.utime(cache.entry_filename('key%s' % i), (now - 10 + i, now - 10 + i))
+
+        ## Using the oldest entry makes the second the least recently used
+        self.assertEqual(cache.get('key0'), ('title0', []))
+        cache.max_size = 2 * size
+        cache.put('key3', 'title3', [])
+        self.assertEqual(self.entries(), ['key0.pickle', 'key3.pickle'])
+        self.assertEqual(cache.size, 2 * size)
+
+        ## Puts below the limit do not scan the directory
+        cache.max_size = 10 * size
+        os.unlink(cache.entry_filename('key0'))
+        cache.put('key4', 'title4', [])
+        self.assertEqual(cache.size, 3 * size)
+        self.assertEqual(cache.get('key1'), None)
+
+    def testget_untrusted(self):
+        """ParseCache refusing corrupt and foreign entries"""
+        cache = ParseCache(directory=self.cache_dir, verbosity=0)
+        self.assertFalse(cache.put('key', 'title', []))
+        self.assertEqual(os.stat(self.cache_dir).st_mode & 0o777, 0o700)
+
+        ## A corrupt entry is not used
+        open(cache.entry_filename('corrupt'), 'wb').write(b'\x80\x05corrupt')
+        self.assertEqual(cache.get('corrupt'), None)
+
+        ## An entry of another user is not loaded
+        if hasattr(os, 'getuid') and os.getuid() == 0:
+            os.chown(cache.entry_filename('key'), 1, -1)
+            self.assertEqual(cache.get('key'), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,12 @@ Classes for dealing with STAR syntax
 """
 from bmrblib.pystarlib.Utils import Lister
 
+import io
+
+## Endings of the tag name of the first tag in a saveframe giving its category
+possibleTagNamesSFCategory = ( '_Saveframe_category',  # 2.1
+                               '.Sf_category' )        # 3
+
 
 """
 Saveframe class
@@ -31,14 +37,28 @@ class SaveFrame (Lister):
     def star_text (self,
                    flavor = 'NMR-STAR'
                    ):
-        str = "\n"
-        str = str + 'save_%s\n' % self.title
-        
+        text = io.StringIO()
+        if self.write_to( text, flavor = flavor ):
+            return 1
+        return text.getvalue()
+
+    """
+    Writes the STAR text representation to the file object table by table.
+    Returns status (None for success, 1 for failure)
+    """
+    def write_to (self,
+                  fileobj,
+                  flavor = 'NMR-STAR'
+                  ):
+        fileobj.write( "\n" )
+        fileobj.write( 'save_%s\n' % self.title )
+
         for tagtable in self.tagtables:
-            str = str + tagtable.star_text( flavor=flavor )
-            
-        str = str + '\nsave_\n'
-        return str
+            if tagtable.write_to( fileobj, flavor=flavor ):
+                return 1
+
+        fileobj.write( '\nsave_\n' )
+        return None
     
     "Simple checks on integrity"
     def check_integrity( self,  recursive = 1  ):
@@ -55,8 +75,6 @@ class SaveFrame (Lister):
     Or print Warning and return None
     """
     def getSaveFrameCategory(self, ):
-        possibleTagNamesSFCategory = [ '_Saveframe_category',  # 2.1
-                                       '.Sf_category' ]        # 3
         if not self.tagtables:
             print("WARNING: no tagtable found in Saveframe")
             return None
@@ -65,11 +83,7 @@ class SaveFrame (Lister):
         if not tT.tagvalues[0]: # assumed 0
             print("WARNING: empty tagtable found in Saveframe")
             return None
-        found = 0
-        for possi in possibleTagNamesSFCategory:
-            if tT.tagnames[0].endswith(possi):
-                found = 1
-        if not found:
+        if not tT.tagnames[0].endswith(possibleTagNamesSFCategory):
             print("WARNING: first tag doesn't look like a Sf_category; taking value anyway")
             
         return tT.tagvalues[0][0]
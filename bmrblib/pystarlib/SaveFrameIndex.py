@@ -0,0 +1,220 @@
+"""
+Index of the saveframes in a STAR file on disk
+"""
+from bmrblib.pystarlib.Utils import Lister
+from bmrblib.pystarlib.SaveFrame import possibleTagNamesSFCategory
+
+import json
+import mmap
+import os
+import re
+
+
+"""
+The index gives for each saveframe in the file its title, category, byte
+offset and length so that a single saveframe can be read and parsed without
+going over the rest of the file. It is kept in a sidecar file next to the
+STAR file, by default the file name with '.idx' appended, together with the
+size and modification time of the STAR file at the time the index was made.
+An index for a file that changed since is not used but made again.
+"""
+
+## The extension of the sidecar file
+index_extension = '.idx'
+
+## Version of the layout of the sidecar file
+index_format = 1
+
+## Finds the beginnings and ends of saveframes in the bytes of a file. The
+## items that can hide a save_ word are matched as well; these are the same
+## as for the tokenizer. The look behinds come after the first character so
+## the search can jump to the next candidate character quickly.
+pattern_saveframe_scan = re.compile(rb"""
+      ; (?<=[\n\r];) .*?[\n\r] ;
+    | ' (?<=\s') .*? ' (?= \s | \Z )
+    | " (?<=\s") .*? " (?= \s | \Z )
+    | \# (?<=\s\#) [^\n\r]*
+    | save_ (?<=\ssave_) (?P<title> \S* )
+     """, re.DOTALL | re.VERBOSE )
+
+## The first tag and its value following a saveframe begin
+pattern_first_tag = re.compile(rb"""
+    (?: \s | \#[^\n\r]*[\n\r] )+
+    (?P<name> _\S+ )
+    (?: \s | \#[^\n\r]*[\n\r] )+
+    (?: ' (?P<single> .*? ) ' (?= \s | \Z )
+      | " (?P<double> .*? ) " (?= \s | \Z )
+      | (?P<word> [^\s;]\S* ) )
+     """, re.DOTALL | re.VERBOSE )
+
+
+"""
+Saveframe index of a STAR file
+saveframes is a list of (title, category, offset, length) tuples in the
+order of the file. The category is None when the first tag of the saveframe
+is not a category tag.
+"""
+class SaveFrameIndex (Lister):
+    def __init__(self,
+                    filename        = '',
+                    index_filename  = None,
+                    verbosity       = 2
+                  ):
+        self.filename       = filename
+        if index_filename is None:
+            index_filename = filename + index_extension
+        self.index_filename = index_filename
+        self.size           = None
+        self.mtime          = None
+        self.saveframes     = []
+        self.verbosity      = verbosity
+
+    """
+    Makes the index from the STAR file.
+    Returns status (None for success, 1 for failure)
+    """
+    def build(self):
+        try:
+            stat = os.stat(self.filename)
+            fileobj = open(self.filename, 'rb')
+        except OSError:
+            print('ERROR: Could not open the STAR file for indexing', self.filename)
+            return 1
+        self.size       = stat.st_size
+        self.mtime      = stat.st_mtime_ns
+        self.saveframes = []
+        if not self.size:
+            fileobj.close()
+            return None
+
+        data = mmap.mmap(fileobj.fileno(), 0, access = mmap.ACCESS_READ)
+        try:
+            open_begin  = None          # Offset of the open saveframe
+            open_title  = None
+            open_category = None
+            for match in pattern_saveframe_scan.finditer(data):
+                title = match.group('title')
+                if title is None:
+                    continue
+                if open_begin is not None:
+                    ## A save_ ends the open saveframe; a new saveframe begin
+                    ## also does but is taken as a new saveframe too.
+                    if title:
+                        end = match.start()
+                    else:
+                        end = match.end()
+                    self.saveframes.append(
+                        (open_title, open_category, open_begin, end - open_begin))
+                    open_begin = None
+                    if not title:
+                        continue
+                elif not title:
+                    if self.verbosity >= 2:
+                        print('WARNING: found the end of a saveframe that was not open at offset:', match.start())
+                    continue
+                open_begin  = match.start()
+                open_title  = title.decode()
+                open_category = None
+                match_first_tag = pattern_first_tag.match(data, match.end())
+                if match_first_tag:
+                    if match_first_tag.group('name').decode().endswith(possibleTagNamesSFCategory):
+                        open_category = match_first_tag.group(match_first_tag.lastgroup).decode()
+            if open_begin is not None:
+                self.saveframes.append(
+                    (open_title, open_category, open_begin, self.size - open_begin))
+        finally:
+            data.close()
+            fileobj.close()
+        return None
+
+    """
+    Returns True when the index was made for the STAR file as it is now.
+    """
+    def is_current(self):
+        try:
+            stat = os.stat(self.filename)
+        except OSError:
+            return False
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime
+
+    """
+    Reads the sidecar file.
+    Returns status (None for success, 1 for failure)
+    """
+    def read(self):
+        try:
+            with open(self.index_filename, 'r') as fileobj:
+                content = json.load(fileobj)
+        except (OSError, ValueError):
+            return 1
+        if content.get('format') != index_format:
+            return 1
+        self.size       = content['size']
+        self.mtime      = content['mtime']
+        self.saveframes = [tuple(sf) for sf in content['saveframes']]
+        return None
+
+    """
+    Writes the sidecar file. The file is written under a temporary name
+    first so that a reader never sees a partly written index.
+    Returns status (None for success, 1 for failure)
+    """
+    def write(self):
+        content = {
+            'format'        : index_format,
+            'size'          : self.size,
+            'mtime'         : self.mtime,
+            'saveframes'    : self.saveframes,
+            }
+        index_filename_tmp = '%s.%s.tmp' % (self.index_filename, os.getpid())
+        try:
+            with open(index_filename_tmp, 'w') as fileobj:
+                json.dump(content, fileobj)
+            os.replace(index_filename_tmp, self.index_filename)
+        except OSError:
+            print('WARNING: Could not write the saveframe index file', self.index_filename)
+            try:
+                os.unlink(index_filename_tmp)
+            except OSError:
+                pass
+            return 1
+        return None
+
+    """
+    Reads the sidecar file when it is current or else makes the index and
+    writes it. Not being able to write the sidecar file is not an error.
+    Returns status (None for success, 1 for failure)
+    """
+    def load(self):
+        if not self.read() and self.is_current():
+            return None
+        if self.build():
+            return 1
+        self.write()
+        return None
+
+    """
+    Returns the (offset, length) of the saveframe with the title or None if
+    there is none.
+    """
+    def title_region(self, title):
+        for sf_title, category, offset, length in self.saveframes:
+            if sf_title == title:
+                return offset, length
+        return None
+
+    """
+    Returns the list of (offset, length) of the saveframes of the category.
+    """
+    def category_regions(self, category):
+        return [(offset, length)
+                for sf_title, sf_category, offset, length in self.saveframes
+                if sf_category == category]
+
+    """
+    Returns the text of the saveframe at the region of the STAR file.
+    """
+    def region_read(self, offset, length):
+        with open(self.filename, 'rb') as fileobj:
+            fileobj.seek(offset)
+            return fileobj.read(length).decode()
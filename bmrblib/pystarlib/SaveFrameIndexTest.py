@@ -0,0 +1,92 @@
+from unittest import TestCase
+import unittest
+import os
+import shutil
+import tempfile
+import time
+from bmrblib.pystarlib.File import File
+from bmrblib.pystarlib.SaveFrameIndex import SaveFrameIndex
+
+
+text = """data_indexed
+save_first
+   _Entry.Sf_category  entry
+   _Entry.Details
+;
+save_
+;
+save_
+
+save_second
+   # comment
+   _Heteronucl_T1_list.Sf_category  'heteronucl_T1_relaxation'
+   loop_
+        _T1.ID
+        _T1.Val
+1 0.5
+2 'save_ 2'
+     stop_
+save_
+
+save_third
+   _Saveframe_category  heteronucl_T1_relaxation
+save_
+"""
+
+
+class AllChecks(TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, 'indexed.str')
+        open(self.filename, 'w').write(text)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def testbuild(self):
+        """SaveFrameIndex build"""
+        index = SaveFrameIndex(filename=self.filename)
+        self.assertFalse(index.build())
+        self.assertEqual([sf[:2] for sf in index.saveframes], [
+            ('first', 'entry'),
+            ('second', 'heteronucl_T1_relaxation'),
+            ('third', 'heteronucl_T1_relaxation')])
+        offset, length = index.title_region('second')
+        self.assertEqual(offset, text.index('save_second'))
+        self.assertEqual(offset + length, text.index('save_\n\nsave_third') + len('save_'))
+        self.assertEqual(index.title_region('fourth'), None)
+
+    def testload(self):
+        """SaveFrameIndex load"""
+        index = SaveFrameIndex(filename=self.filename)
+        self.assertFalse(index.load())
+        self.assertTrue(os.path.exists(self.filename + '.idx'))
+        index_read = SaveFrameIndex(filename=self.filename)
+        self.assertFalse(index_read.read())
+        self.assertTrue(index_read.is_current())
+        self.assertEqual(index_read.saveframes, index.saveframes)
+
+        ## A changed file is indexed again
+        time.sleep(0.01)
+        open(self.filename, 'w').write(text.replace('save_third', 'save_3'))
+        self.assertFalse(index_read.is_current())
+        self.assertFalse(index_read.load())
+        self.assertEqual(index_read.saveframes[-1][0], '3')
+
+    def testload_saveframe(self):
+        """File load_saveframe and getSaveFrames from file"""
+        strf = File(filename=self.filename)
+        self.assertFalse(strf.read())
+        for engine in ('regex', 'tokenizer'):
+            strf_index = File(filename=self.filename)
+            sf = strf_index.load_saveframe('second', engine=engine)
+            self.assertEqual(sf.star_text(), strf.datanodes[1].star_text())
+            self.assertEqual(strf_index.datanodes, [])
+            sfs = strf_index.getSaveFrames('heteronucl_T1_relaxation', from_file=True, engine=engine)
+            self.assertEqual([sf.star_text() for sf in sfs],
+                [sf.star_text() for sf in strf.getSaveFrames('heteronucl_T1_relaxation')])
+        self.assertEqual(File(filename=self.filename).load_saveframe('fourth'), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,8 +15,9 @@ from bmrblib.pystarlib.Text import pattern_unquoted_find
 from bmrblib.pystarlib.Text import pattern_tag_name
 from bmrblib.pystarlib.Text import tag_value_parse
 from bmrblib.pystarlib.Utils import Lister
-from bmrblib.pystarlib.Utils import transpose
+from bmrblib.pystarlib.Column import Column
 
+from itertools import islice
 import types
 import re
 
@@ -58,100 +59,138 @@ class TagTable (Lister):
     def star_text ( self,
                     flavor                  = 'NMR-STAR'
                    ):
+        loop_ident_size = self._loop_ident_size( flavor )
+        if loop_ident_size == None:
+            return 1
+        return ''.join( self._star_text_chunks( loop_ident_size ) )
+
+    """
+    Writes the STAR text representation to the file object in chunks of
+    rows_per_chunk rows without making the text of the whole table.
+    Returns status (None for success, 1 for failure)
+    """
+    def write_to ( self,
+                   fileobj,
+                   flavor                  = 'NMR-STAR',
+                   rows_per_chunk          = 1000
+                  ):
+        loop_ident_size = self._loop_ident_size( flavor )
+        if loop_ident_size == None:
+            return 1
+        for chunk in self._star_text_chunks( loop_ident_size, rows_per_chunk ):
+            fileobj.write( chunk )
+        return None
+
+    """
+    Number of spaces before the loop_ tag for the flavor or None for an
+    unknown flavor.
+    """
+    def _loop_ident_size( self, flavor ):
         ## Info herein can be transferred to a STAR reference file too
         if flavor == None or flavor == 'NMR-STAR':
             # Number of spaces before the loop_ tag. 0 in CIF
-            loop_ident_size     = 3
+            return 3
         elif flavor == 'mmCIF':
-            loop_ident_size     = 0
-        else:
-            print('ERROR: Unknown flavor of STAR given', flavor)
-            return 1
-                
+            return 0
+        print('ERROR: Unknown flavor of STAR given', flavor)
+        return None
+
+    """
+    Generator over the pieces of the STAR text representation.
+    """
+    def _star_text_chunks( self, loop_ident_size, rows_per_chunk = 1000 ):
         free_ident_size         = loop_ident_size
         tagnames_ident_size     = loop_ident_size + 3
         show_stop_tag           = 1
-        
-        str         = ''
-        count       = -1
-        count_hash  = 100000 # Show progress hashes while composing text for each count_hash number of values approximately
-        
+
         ## Free tags here
         if self.free:
-            i = 0
-            for tagname in self.tagnames:
+            chunks = []
+            for tagname, values in zip( self.tagnames, self.tagvalues ):
                 ## Just format it such that it will take the least space
-                if pattern_quotes_needed.search( self.tagvalues[i][0] ):
-                    tagvalue = quotes_add( self.tagvalues[i][0] )
-                else:
-                    tagvalue = self.tagvalues[i][0]
-                str = str + free_ident_size * ' ' + "%s %s" % ( tagname, tagvalue )
-                if tagvalue[ -1 ] != '\n':
-                    str = str + '\n'
-                i = i + 1
-            return str
-        
-        ## Loop tags here
-        str = str + loop_ident_size * ' ' + 'loop_\n'
+                tagvalue = values[0]
+                if pattern_quotes_needed.search( tagvalue ):
+                    tagvalue = quotes_add( tagvalue )
+                chunks.append( free_ident_size * ' ' + "%s %s" % ( tagname, tagvalue ) )
+                if not tagvalue.endswith( '\n' ):
+                    chunks.append( '\n' )
+            yield ''.join( chunks )
+            return
 
+        ## Loop tags here
+        chunks = [ loop_ident_size * ' ' + 'loop_\n' ]
         for tagname in self.tagnames:
             ## Just format it such that it will take the least space
-            str = str + tagnames_ident_size * ' ' + '%s\n' % tagname
-        str = str + '\n'
-            
-        col_count = len( self.tagnames )
-        row_count = len( self.tagvalues[0] )
-        col_range = list(range( col_count))
-        row_range = list(range( row_count))
-
-        str_row = []
-        row_id = 0
-        tag_id = 0
-        ## This will quicken further actions and in itself is rather
-        ## quick as we're using build in functions. I need to do this because
-        ## I don't know of any splicing method that can get me a row from
-        ## the table. The command below clocked 0.2 sec. on 0.6 Mb table (including
-        ## spaces before parsing it was 1 Mb)
-        ## Any quicker method in other modules?
-        tagvalues_tr = transpose( self.tagvalues )
-        
-        for row_id in row_range:
-
-            str_tmp = ','.join(tagvalues_tr[row_id])
-
-            ## Are quotes needed? Do it per row first to get some speed perhaps
-            match_quotes_needed_2 = pattern_quotes_needed_2.search( str_tmp )
-            if match_quotes_needed_2:
-                str_tmp = ''
-                for col_id in col_range:
-                    ## Just format it such that it will take the least space
-                    if pattern_quotes_needed.search( self.tagvalues[col_id][row_id] ):
-                        str_tmp = str_tmp + '%s ' % quotes_add( self.tagvalues[col_id][row_id] )
-                    else:
-                        str_tmp = str_tmp + '%s ' % self.tagvalues[col_id][row_id]
-            else:
-                str_tmp = ' '.join(tagvalues_tr[row_id])
-
-            str_row.append( str_tmp )
+            chunks.append( tagnames_ident_size * ' ' + '%s\n' % tagname )
+        chunks.append( '\n' )
+        yield ''.join( chunks )
+
+        ## Each row is followed by an end of line
+        rows = self._loop_rows_text()
+        row_count = 0
+        while True:
+            chunk = list( islice( rows, rows_per_chunk ) )
+            if not chunk:
+                break
+            chunk.append( '' )
+            yield '\n'.join( chunk )
+            row_count += len( chunk ) - 1
+            if self.verbosity >= 9:
+                print('##### %s looped rows collected ######' % row_count)
 
-            ## Perhaps delete for speed later on...
-            if self.verbosity > 1:
-                tag_id = tag_id + col_count
-                if tag_id - count > count_hash:
-                    count = tag_id
-                    if self.verbosity >= 9:
-                        print('##### %s looped tag values collected ######' % count_hash)
-                                
         if show_stop_tag:
-            str_row.append( '\n' + loop_ident_size * ' ' + 'stop_\n' )
+            yield '\n' + loop_ident_size * ' ' + 'stop_\n'
 
-        str = str + '\n'.join(str_row)
+    """
+    Generator over the text of each row of a looped tagtable.
+    A row in which a value needs quotes is written with each value quoted
+    as needed and followed by a space; other rows are just the values joined
+    by spaces. Which rows need quotes is decided per column: a column is
+    searched as a whole first and only in columns with a match each distinct
+    value is checked once.
+    A row is marked as needing quotes when pattern_quotes_needed_2 matches
+    the values of the row joined by commas, like the row by row check did.
+    """
+    def _loop_rows_text( self ):
+        columns             = self.tagvalues
+        columns_formatted   = []
+        columns_row_flags   = []
+        for col_id, column in enumerate( columns ):
+            if not pattern_quotes_needed_2.search( ',' + ','.join( column ) ):
+                columns_formatted.append( column )
+                continue
+            ## The first value in a row is not preceded by a comma
+            prefix = ','
+            if col_id == 0:
+                prefix = ''
+            cache       = {}
+            formatted   = []
+            row_flags   = []
+            for value in column:
+                decision = cache.get( value )
+                if decision == None:
+                    value_formatted = value
+                    if pattern_quotes_needed.search( value ):
+                        value_formatted = quotes_add( value )
+                    row_flag = pattern_quotes_needed_2.search( prefix + value ) != None
+                    decision = cache[ value ] = ( value_formatted, row_flag )
+                formatted.append( decision[0] )
+                row_flags.append( decision[1] )
+            columns_formatted.append( formatted )
+            columns_row_flags.append( row_flags )
+
+        if not columns_row_flags:
+            yield from map( ' '.join, zip( *columns ) )
+            return
+
+        for row_flag, row, row_formatted in zip( map( any, zip( *columns_row_flags ) ),
+                                                zip( *columns ),
+                                                zip( *columns_formatted ) ):
+            if row_flag:
+                yield ' '.join( row_formatted ) + ' '
+            else:
+                yield ' '.join( row )
 
-        # Save some space
-        del tagvalues_tr
-        
-        return str
-    
     """
     A title identifing a tagtable by its tagnames
     simply the space separated concatenation of the tag names
@@ -162,6 +201,33 @@ class TagTable (Lister):
         self.title = ''.join(self.tagnames)
 
                 
+    """
+    Replaces the value lists of a looped tagtable by Column objects that
+    keep the values of a column in a single buffer. Columns with other
+    values than strings are left as they are.
+    """
+    def columns_compact( self ):
+        if self.free:
+            return
+        for i, values in enumerate( self.tagvalues ):
+            if isinstance( values, Column ):
+                continue
+            try:
+                self.tagvalues[ i ] = Column( values )
+            except TypeError:
+                pass
+
+
+    """
+    Replaces any Column objects in tagvalues by lists so that the values
+    can be changed.
+    """
+    def columns_expand( self ):
+        for i, values in enumerate( self.tagvalues ):
+            if isinstance( values, Column ):
+                self.tagvalues[ i ] = list( values )
+
+
     """
     Size and type checks to be extended
     0 Only fast checks
@@ -217,10 +283,13 @@ class TagTable (Lister):
     hitting a quoted tag value. I estimate in the large tables only 1 in
     1000 has a ;; block and only 1 in 5-10 has '' or "" block. For the part
     that is not quoted the parsing can be really fast.
+    - The end of a looped tagtable is found with the StructureIndex of the
+    text if one is given, instead of searching the text from pos.
     """
     def parse(  self,
                 text      = '',
-                pos       = 0 ):
+                pos       = 0,
+                structure_index = None ):
         ## Parse free tagtable reading all tag name/value pairs
         if self.free:
             pos = self._tagtable_free_parse( text, pos )
@@ -262,9 +331,14 @@ class TagTable (Lister):
             return None
 
 ##        pos_sf_begin_or_end_nws = pattern_unquoted_find(text, pattern_sf_begin_or_end, pos)        
-        pos_tagtable_loop = pattern_unquoted_find(text, pattern_tagtable_loop_2, pos)
-        pos_tagtable_stop = pattern_unquoted_find(text, pattern_tagtable_stop_2, pos)
-        pos_tagname       = pattern_unquoted_find(text, pattern_tagname_2, pos)
+        if structure_index != None:
+            pos_tagtable_loop = structure_index.find(pattern_tagtable_loop_2, pos)
+            pos_tagtable_stop = structure_index.find(pattern_tagtable_stop_2, pos)
+            pos_tagname       = structure_index.find(pattern_tagname_2, pos)
+        else:
+            pos_tagtable_loop = pattern_unquoted_find(text, pattern_tagtable_loop_2, pos)
+            pos_tagtable_stop = pattern_unquoted_find(text, pattern_tagtable_stop_2, pos)
+            pos_tagname       = pattern_unquoted_find(text, pattern_tagname_2, pos)
 
         ## Find the first one and set the end postion to the beginning of
         ## the match excluding the beginning white space character
@@ -420,11 +494,8 @@ class TagTable (Lister):
                     ## Parse all unquoted tag values beginning from position
                     ## UP TO specified end position
                     ## NOT QUOTED                    
-                    for t in text[pos:tempendpos].split():
-                        self.tagvalues[tag_id].append( t )
-                        tag_id += 1
-                        if tag_id == names_length: 
-                            tag_id = 0                                        
+                    tag_id = self._tokens_distribute(
+                        text[pos:tempendpos].split(), tag_id )
                     if tempendpos == match_quoted.start():
                         ## QUOTED:
                         pos = tempendpos
@@ -442,11 +513,8 @@ class TagTable (Lister):
                     else:
                         pos = tempendpos
             else: # NOT quoted until end (only executed once)
-                for t in text[pos:pos_end].split():
-                    self.tagvalues[tag_id].append( t )
-                    tag_id += 1
-                    if tag_id == names_length: 
-                        tag_id = 0
+                tag_id = self._tokens_distribute(
+                    text[pos:pos_end].split(), tag_id )
                 pos = text_length # Needed to break while loop               
             
         col_length = len( self.tagvalues[-1] )    
@@ -458,7 +526,7 @@ class TagTable (Lister):
                   % ( col_length, tag_id ))
             print("Tag names of this table are:")
             print(self.tagnames)            
-            for xxx in range(0, len(self.tagvalues[0])):             
+            for xxx in range(0, col_length):             
                 for yyy in range(0, len(self.tagvalues)):
                     print(self.tagvalues[yyy][xxx])              
                 print('-----------------------------------------------')              
@@ -475,3 +543,17 @@ class TagTable (Lister):
         # Set the title
         self.set_title()
         return None
+
+
+    """
+    Distributes a run of unquoted tag values over the columns, the first
+    value going to the column tag_id. Each column gets its values by a
+    slice of the run with the number of columns as the step.
+    Returns the column of the value following the run.
+    """
+    def _tokens_distribute( self, tokens, tag_id ):
+        names_length = len( self.tagnames )
+        for i in range( min( names_length, len( tokens ) ) ):
+            self.tagvalues[ ( tag_id + i ) % names_length ].extend(
+                tokens[ i::names_length ] )
+        return ( tag_id + len( tokens ) ) % names_length
@@ -1,5 +1,6 @@
 from unittest import TestCase
 import __init__
+import io
 import unittest
 
 from bmrblib.pystarlib.TagTable import TagTable
@@ -53,7 +54,67 @@ e
 #        print exp
 #        print tt.star_text()
         self.assertEqual(exp, tt.star_text())
-    
+
+    def testwrite_to(self):
+        """TagTable write_to"""
+        tt = TagTable(  free      = None,
+                        tagnames  = ['_A.a', '_A.b'],
+                        tagvalues = [['1', '2', 'x,_y', '4'], ['a', 'b', 'c', "H5'"]],
+                        verbosity = 2)
+        exp = """   loop_
+      _A.a
+      _A.b
+
+1 a
+2 b
+x,_y c 
+4 "H5'" 
+
+   stop_
+"""
+        self.assertEqual(exp, tt.star_text())
+        for rows_per_chunk in (1, 3, 1000):
+            out = io.StringIO()
+            self.assertFalse(tt.write_to(out, rows_per_chunk = rows_per_chunk))
+            self.assertEqual(exp, out.getvalue())
+
+    def testtokens_distribute(self):
+        """TagTable _tokens_distribute"""
+        ## Runs of values split at any point give the columns of the
+        ## values appended one by one
+        tokens = [str(i) for i in range(11)]
+        for names_length in (1, 2, 3, 5):
+            for split in range(len(tokens) + 1):
+                tt = TagTable(  free      = None,
+                                tagnames  = ['_A.%s' % i for i in range(names_length)],
+                                tagvalues = [[] for i in range(names_length)],
+                                verbosity = 2)
+                tag_id = tt._tokens_distribute(tokens[:split], 0)
+                tag_id = tt._tokens_distribute(tokens[split:], tag_id)
+                exp = [[] for i in range(names_length)]
+                for i, token in enumerate(tokens):
+                    exp[i % names_length].append(token)
+                self.assertEqual(exp, tt.tagvalues)
+                self.assertEqual(len(tokens) % names_length, tag_id)
+
+        ## A single column, with quoted values between the runs
+        text = """_A.a 1 2 "3 x" 4 5 '6 y' 7"""
+        tt = TagTable(  free      = None,
+                        tagnames  = [],
+                        tagvalues = [],
+                        verbosity = 2)
+        self.assertEqual(len(text), tt.parse( text = text, pos = 0))
+        self.assertEqual([['1', '2', '3 x', '4', '5', '6 y', '7']], tt.tagvalues)
+
+        ## A number of values that does not fill the last row
+        for text in ( """_A.a _A.b 1 a 2 b 3""",
+                      """_A.a _A.b _A.c 1 a "q r" 2 b""" ):
+            tt = TagTable(  free      = None,
+                            tagnames  = [],
+                            tagvalues = [],
+                            verbosity = 2)
+            self.assertEqual(None, tt.parse( text = text, pos = 0))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -7,6 +7,7 @@ ___revision__ = "$Revision: 13 $"
 ___date__     = "$Date: 2007-08-22 20:59:28 +0200 (Wed, 22 Aug 2007) $"
 
 ## Standard modules
+from bisect import bisect_left
 import re
 
 """
@@ -57,6 +58,11 @@ pattern_semicolon_block = re.compile(r"""
 
 pattern_eol_string     = re.compile( eol_string, re.MULTILINE )
 
+## A semicolon at the beginning of a line, used in collapsing semicolon blocks
+pattern_semicolon_only = re.compile( r'^;', re.MULTILINE )
+## Same but for uncollapsed text with any end of line style
+pattern_semicolon_line_begin = re.compile( r'[\n\r];' )
+
 ## Next pattern tells when search for on ONE tagvalue if it needs quotes
 pattern_quotes_needed  = re.compile( r'[\s\'\"]|^_|^\#' ) 
 
@@ -88,6 +94,10 @@ pattern_tag_name_nws        = re.compile('_\S')
 pattern_tagtable_loop_2 = re.compile('\sloop_\s+' )
 pattern_tagtable_stop_2 = re.compile('\sstop_\s+' )
 pattern_tagname_2       = re.compile('\s_\S+\s+' )
+pattern_save_end_2      = re.compile('\ssave_(?:\s|$)' )
+## Any of the three patterns above, by their group, without eating the rest
+pattern_tagtable_bounds_2 = re.compile('\s(?=(loop_\s)|(stop_\s)|(_\S+\s))' )
+pattern_quote_char      = re.compile('[\'"]' )
 
 pattern_tag_name = re.compile(r"""(_\S+) \s+
      """, re.DOTALL | re.MULTILINE | re.VERBOSE )
@@ -231,6 +241,71 @@ def pattern_unquoted_find(text, pattern, pos=0):
         return pos
 
     
+"""
+Index of the positions at which pattern_tagtable_loop_2,
+pattern_tagtable_stop_2 and pattern_tagname_2 match unquoted in the text.
+The text is scanned once and the quote style is tracked per line in the
+same way as pattern_unquoted_find does. The find method then returns the
+same position as pattern_unquoted_find by a binary search over the index.
+The same requirements on the text apply.
+"""
+class StructureIndex:
+    def __init__( self, text ):
+        self.positions = {
+            pattern_tagtable_loop_2: [],
+            pattern_tagtable_stop_2: [],
+            pattern_tagname_2:       [] }
+        lists = ( self.positions[ pattern_tagtable_loop_2 ],
+                  self.positions[ pattern_tagtable_stop_2 ],
+                  self.positions[ pattern_tagname_2 ] )
+        ## Quote style of the line up to the scanned position
+        scanned     = 0
+        line_begin  = 0
+        squoted     = None
+        dquoted     = None
+        for match in pattern_tagtable_bounds_2.finditer( text ):
+            pos = match.start()
+            positions = lists[ match.lastindex - 1 ]
+            ## At the beginning of the string or of a line
+            if pos == 0 or text[ pos ] == '\n':
+                positions.append( pos )
+                continue
+            ## A new line since the last position
+            pos_eol = text.rfind( '\n', scanned, pos )
+            if pos_eol != -1:
+                scanned     = line_begin = pos_eol + 1
+                squoted     = None
+                dquoted     = None
+            ## In a semicolon block
+            if pos > line_begin and text[ line_begin ] == ';':
+                if verbosity > 9:
+                    print('WARNING: (1) found pattern at: [%s] in semicolon block' % pos)
+                continue
+            for match_quote in pattern_quote_char.finditer( text, scanned, pos ):
+                if match_quote.group() == "'":
+                    if not dquoted:
+                        squoted = not squoted
+                elif not squoted:
+                    dquoted = not dquoted
+            scanned = pos
+            if squoted or dquoted:
+                if verbosity > 9:
+                    print('WARNING: (2) found pattern at: [%s] in quotes' % pos)
+                continue
+            positions.append( pos )
+
+    """
+    Returns the first position from pos at which the pattern matches
+    unquoted or -1 if there is none.
+    """
+    def find( self, pattern, pos = 0 ):
+        positions = self.positions[ pattern ]
+        index = bisect_left( positions, pos )
+        if index == len( positions ):
+            return -1
+        return positions[ index ]
+
+
 """
 Parse one quoted tag value beginning from position: pos
 Return the value and the position of the 'cursor' behind the
@@ -295,14 +370,13 @@ def tag_value_quoted_parse( text, pos ):
 From text on position pos, read a tag value and return the value and
 position of the next non-space char. This is the slow parsing method
 that should only be used for free tags.
+The quote is only looked for at pos; searching for it further on went
+over the rest of the text for every value after the last quote.
 """
 def tag_value_parse( text, pos):
 
-    match_quoted = pattern_quoted.search( text, pos )
-    if match_quoted:      
-        if match_quoted.start() == pos:
-            
-            return tag_value_quoted_parse( text, pos ) # Better speed with this code
+    if pattern_quoted.match( text, pos ):
+        return tag_value_quoted_parse( text, pos ) # Better speed with this code
                 
     match_word = pattern_word.search( text, pos )
     if not match_word:
@@ -333,46 +407,52 @@ Putting all semicolon separated values on one line
 by replacing the eol within with a unique key value
 that is to be remove later on by it's sibling method:
 semicolon_block_expand.
-SPEED:  0.6 cpu seconds for a 5 Mb file with 31 blocks and
-        1.3 "                10 "            64 ".
+The text is scanned once from front to back with precompiled patterns and
+the result is assembled from a list of chunks so the time taken grows
+linearly with the size of the text. Rebuilding the string for every block
+made the old code quadratic for files with many blocks.
 """
 def semicolon_block_collapse( text ):
-    
+
     count = 0
     startpos = 0
-    
-    # TODO: this is not good - since text[startpos:] is used it's always the start of a line, so if string starts with ;...
-    pattern_semicolon_only = re.compile("^\;", re.MULTILINE)
-    pattern_semicolon_only_end = re.compile("(^\;\s*)", re.MULTILINE)
-    
-    semicolon_start = pattern_semicolon_only.search(text[startpos:])
-    
-    while(semicolon_start):
-
-      count += 1
-      
-      startpos = startpos + semicolon_start.start()
-      semicolon_end = pattern_semicolon_only_end.search(text[startpos+1:])
-      try:
-        endpos = startpos + 1 + semicolon_end.end() - len(semicolon_end.group(1)) + 1
-      except:
-        print("ERROR in semicolon_block_collapse for text starting at: ["+ text[startpos:startpos+100]+ "]")            
-        raise
-    
-      text_replace = re.sub("\n", eol_string, text[startpos:endpos])
+    chunks = []
+
+    while True:
+        # A semicolon directly at the scan position also counts as a block
+        # begin; that was the behaviour of the original sliced searches.
+        if text.startswith(';', startpos):
+            blockstart = startpos
+        else:
+            semicolon_start = pattern_semicolon_only.search(text, startpos)
+            if not semicolon_start:
+                break
+            blockstart = semicolon_start.start()
+
+        count += 1
+
+        if text.startswith(';', blockstart+1):
+            blockend = blockstart + 1
+        else:
+            semicolon_end = pattern_semicolon_only.search(text, blockstart+1)
+            try:
+                blockend = semicolon_end.start()
+            except:
+                print("ERROR in semicolon_block_collapse for text starting at: ["+ text[blockstart:blockstart+100]+ "]")
+                raise
+        endpos = blockend + 1
+
+        chunks.append(text[startpos:blockstart])
+        chunks.append(text[blockstart:endpos].replace('\n', eol_string))
+        startpos = endpos
+
+    chunks.append(text[startpos:])
 
-      # This is bulky and not very elegant but works
-      text= text[0:startpos] + text_replace + text[endpos:]
-    
-      startpos = startpos + len(text_replace)
-    
-      semicolon_start = pattern_semicolon_only.search(text[startpos:])
-   
     # Original code: can't handle re matches that are too long
     #text, count = pattern_semicolon_block.subn( semicolon_block_replace, text )
     if verbosity >= 9:
         print('Done [%s] subs with semicolon blocks' % count)
-    return text
+    return ''.join(chunks)
 
 def semicolon_block_expand( text ):        
     return pattern_eol_string.sub('\n', text )
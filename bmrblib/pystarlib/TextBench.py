@@ -0,0 +1,45 @@
+"""
+Timing of the text preprocessing functions on synthetic STAR text.
+Not part of the unit tests as the larger sizes take a while and a lot of
+memory.
+
+Call by:
+python TextBench.py [size_in_Mb ...]
+
+Without arguments sizes of 1, 10 and 100 Mb are timed. The time per Mb
+should stay about constant when the scaling is linear.
+"""
+import sys
+import time
+from bmrblib.pystarlib.Text import semicolon_block_collapse
+
+
+"""
+A piece of looped text with a semicolon block and a few lines of regular
+values, about 100 bytes. Repeated to make up the requested size.
+"""
+unit = """;
+Some details on this
+value
+;
+1 2.345 ALA N 15
+2 3.456 GLY N 15
+"""
+
+def star_text_create( size ):
+    return unit * ( size // len(unit) )
+
+def time_collapse( size ):
+    text = star_text_create( size )
+    time_start = time.time()
+    semicolon_block_collapse( text )
+    return time.time() - time_start
+
+if __name__ == "__main__":
+    sizes = [ int(arg) for arg in sys.argv[1:] ]
+    if not sizes:
+        sizes = [ 1, 10, 100 ]
+    print("%10s %12s %12s" % ( "Size (Mb)", "Time (s)", "s per Mb" ))
+    for size in sizes:
+        t = time_collapse( size * 1024 * 1024 )
+        print("%10s %12.3f %12.4f" % ( size, t, t / size ))
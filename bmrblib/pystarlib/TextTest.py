@@ -1,6 +1,13 @@
 from unittest import TestCase
 import unittest
 from bmrblib.pystarlib.Text import comments_strip
+from bmrblib.pystarlib.Text import semicolon_block_collapse
+from bmrblib.pystarlib.Text import semicolon_block_expand
+from bmrblib.pystarlib.Text import pattern_tagname_2
+from bmrblib.pystarlib.Text import pattern_tagtable_loop_2
+from bmrblib.pystarlib.Text import pattern_tagtable_stop_2
+from bmrblib.pystarlib.Text import pattern_unquoted_find
+from bmrblib.pystarlib.Text import StructureIndex
 
 
 class AllChecks(TestCase):
@@ -166,5 +173,64 @@ test2 # no comment 2
         textNew = comments_strip( text )
         self.assertEqual( textNew, textExpected)
 
+    def testsemicolon_block_collapse(self):
+        """semicolon_block_collapse"""
+        text = """_Test
+;
+mmy xie
+;
+_Test2
+;
+second
+block
+;
+_Test3 value
+"""
+        textExpected = """_Test
+;<eol-string>mmy xie<eol-string>;
+_Test2
+;<eol-string>second<eol-string>block<eol-string>;
+_Test3 value
+"""
+        textNew = semicolon_block_collapse( text )
+        self.assertEqual( textNew, textExpected)
+        self.assertEqual( semicolon_block_expand( textNew ), text)
+
+    def testsemicolon_block_collapse2(self):
+        """semicolon_block_collapse 2"""
+        text = """;
+first
+;;
+second
+;
+"""
+        textExpected = """;<eol-string>first<eol-string>;;<eol-string>second<eol-string>;
+"""
+        textNew = semicolon_block_collapse( text )
+        self.assertEqual( textNew, textExpected)
+        self.assertEqual( semicolon_block_collapse( "no blocks\n" ), "no blocks\n")
+
+    def testStructureIndex(self):
+        """StructureIndex"""
+        text = semicolon_block_collapse( """
+   loop_
+      _A
+      _B
+
+1 'quoted _x stop_ '
+2 "H5'' loop_ "
+;
+_semi stop_
+;
+   stop_
+ _C "it's _y"
+""" )
+        index = StructureIndex( text )
+        for pattern in ( pattern_tagtable_loop_2, pattern_tagtable_stop_2, pattern_tagname_2 ):
+            for pos in range( len( text ) + 1 ):
+                self.assertEqual( index.find( pattern, pos ),
+                                  pattern_unquoted_find( text, pattern, pos ) )
+        self.assertEqual( index.find( pattern_tagtable_stop_2, 20 ), text.index( '   stop_' ) + 2 )
+
 if __name__ == "__main__":
     unittest.main()
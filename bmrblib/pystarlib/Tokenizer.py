@@ -0,0 +1,200 @@
+"""
+Single pass tokenizer for STAR text
+"""
+import re
+
+"""
+The tokenizer walks over the raw text once and emits the STAR tokens
+directly. Comments, quoted values, semicolon blocks and the different end of
+line styles (\\n, \\r\\n and \\r) are dealt with while scanning so that none of
+the preprocessing passes over the whole text that the regular parser needs
+(dos2unix, mac2unix, comments_strip and semicolon_block_collapse) have to be
+made.
+
+Each token is a tuple of the token type and its text. For the save frame
+begin and data tokens the text is the full word, e.g. 'save_entry_1', so that
+a keyword in the position of a tag value can still be used as a value.
+The keywords and tag names are told apart from the values by the scanner
+itself. A run of unquoted values, like the rows of a loop, is matched at
+once; with runs set the run is given as a single TOKEN_VALUES token with the
+text of the run, which the parser splits on white space, instead of a token
+per value.
+"""
+
+## Token types
+TOKEN_DATA          = 'data'
+TOKEN_SAVE_BEGIN    = 'save_begin'
+TOKEN_SAVE_END      = 'save_end'
+TOKEN_LOOP          = 'loop'
+TOKEN_STOP          = 'stop'
+TOKEN_TAG           = 'tag'
+TOKEN_VALUE         = 'value'
+TOKEN_VALUES        = 'values'
+TOKEN_ERROR         = 'error'
+
+## An unquoted value: a word that is not a keyword and does not start like a
+## tag name, a quoted value, a semicolon block or a comment.
+pattern_plain = r"""
+    (?! save_ | data_ | (?: loop_ | stop_ ) (?: \s | \Z ) )
+    [^\s_'";\#] \S*
+"""
+
+## Only white space is skipped by finditer; any other character starts one of
+## the alternatives below. A semicolon block starts with a semicolon at the
+## beginning of a line and ends with the first semicolon that is again at the
+## beginning of a line. Quoted values end with the first matching quote that
+## is followed by white space so values like "H5'" or 'it''s' are allowed.
+## The remaining words that do not fit any other alternative, e.g. an
+## unmatched quote, are left to the word group.
+pattern_token = re.compile(r"""
+      (?P<comment>  \#[^\n\r]* )
+    | (?: (?<=[\n\r]) | ^ ) ; (?P<semicolon> .*?[\n\r] ) ;
+    | ' (?P<single> .*? ) ' (?= \s | \Z )
+    | " (?P<double> .*? ) " (?= \s | \Z )
+    | (?P<values>   %s (?: \s+ %s )* )
+    | (?P<tag>      _ \S* )
+    | (?P<save_end> save_ ) (?= \s | \Z )
+    | (?P<save_begin> save_ \S+ )
+    | (?P<data>     data_ \S* )
+    | (?P<loop>     loop_ ) (?= \s | \Z )
+    | (?P<stop>     stop_ ) (?= \s | \Z )
+    | (?P<word>     \S+ )
+     """ % ( pattern_plain, pattern_plain ), re.DOTALL | re.VERBOSE )
+
+## Finds the save_ ending a saveframe without making the tokens in between.
+## Only the items that can hide a save_ word are matched besides it; these
+## are the same as for pattern_token and start a word just the same. The
+## look behinds come after the first character so the search can jump to the
+## next candidate character quickly.
+pattern_save_end_skip = re.compile(r"""
+      ; (?<=[\n\r];) .*?[\n\r] ;
+    | ' (?<=\s') .*? ' (?= \s | \Z )
+    | " (?<=\s") .*? " (?= \s | \Z )
+    | \# (?<=\s\#) [^\n\r]*
+    | (?P<save_end> save_ ) (?<=\ssave_) (?= \s | \Z )
+     """, re.DOTALL | re.VERBOSE )
+
+## The same patterns for bytes, e.g. a memory mapped file. All characters in
+## the patterns are ASCII so the bytes of any ASCII compatible encoding like
+## UTF-8 can be scanned.
+pattern_token_bytes = re.compile( pattern_token.pattern.encode(), re.DOTALL | re.VERBOSE )
+pattern_save_end_skip_bytes = re.compile( pattern_save_end_skip.pattern.encode(), re.DOTALL | re.VERBOSE )
+
+pattern_eol_variations = re.compile( r'\r\n?' )
+
+## The token types of the groups of pattern_token giving their text as is
+group_tokens = {
+    'tag'           : TOKEN_TAG,
+    'save_end'      : TOKEN_SAVE_END,
+    'save_begin'    : TOKEN_SAVE_BEGIN,
+    'data'          : TOKEN_DATA,
+    'loop'          : TOKEN_LOOP,
+    'stop'          : TOKEN_STOP,
+    }
+
+
+"""
+Generator over the (token type, text) tuples of the STAR text.
+The text can also be bytes or a memory mapped file; then only the parts that
+become tokens are decoded (as UTF-8) and the text itself is never copied.
+With runs set a run of unquoted values is a single TOKEN_VALUES token.
+On a syntax error a message is printed and a single TOKEN_ERROR token with
+the offending position is returned as the last token.
+Sending TOKEN_SAVE_END to the generator skips the text up to the save_ that
+ends the current saveframe; the save_ is the next token. When there is no
+such save_ the generator stops.
+"""
+def tokenize( text, runs = False ):
+    if isinstance( text, str ):
+        binary  = False
+        pattern = pattern_token
+        eols    = '\n\r'
+    else:
+        binary  = True
+        pattern = pattern_token_bytes
+        eols    = b'\n\r'
+    pos = 0
+    while pos is not None:
+        matches = pattern.finditer( text, pos )
+        pos = None
+        for match in matches:
+            group = match.lastgroup
+            if group == 'values':
+                value = match.group( group )
+                if binary:
+                    value = value.decode()
+                if runs:
+                    if ( yield TOKEN_VALUES, value ) == TOKEN_SAVE_END:
+                        pos = save_end_find( text, match.end() )
+                        break
+                    continue
+                skip = False
+                for word in value.split():
+                    if ( yield TOKEN_VALUE, word ) == TOKEN_SAVE_END:
+                        skip = True
+                        break
+                if skip:
+                    pos = save_end_find( text, match.end() )
+                    break
+                continue
+            if group == 'comment':
+                continue
+            if group in group_tokens:
+                value = match.group( group )
+                if binary:
+                    value = value.decode()
+                token = group_tokens[ group ], value
+            elif group == 'word':
+                word = match.group( 'word' )
+                c = word[:1]
+                if c in ( "'", '"', b"'", b'"' ):
+                    pos = match.start()
+                    print("ERROR: No matching quote char found for quote char at offset:", pos)
+                    print("ERROR: Next 70 chars are: [%s]" % text_snippet( text, pos ))
+                    yield TOKEN_ERROR, pos
+                    return
+                if c in ( ';', b';' ) and ( match.start() == 0 or text[ match.start()-1:match.start() ] in eols ):
+                    pos = match.start()
+                    print("ERROR: No matching semicolon found for semicolon char at offset:", pos)
+                    print("ERROR: Next 70 chars are: [%s]" % text_snippet( text, pos ))
+                    yield TOKEN_ERROR, pos
+                    return
+                if binary:
+                    word = word.decode()
+                token = TOKEN_VALUE, word
+            else:
+                value = match.group( group )
+                if binary:
+                    value = value.decode()
+                if '\r' in value:
+                    value = pattern_eol_variations.sub( '\n', value )
+                token = TOKEN_VALUE, value
+            if ( yield token ) == TOKEN_SAVE_END:
+                pos = save_end_find( text, match.end() )
+                break
+
+
+"""
+Returns the 70 characters of text from pos on for error messages.
+"""
+def text_snippet( text, pos ):
+    snippet = text[ pos:pos+70 ]
+    if not isinstance( snippet, str ):
+        snippet = snippet.decode( errors = 'replace' )
+    return snippet
+
+
+"""
+Returns the offset of the save_ ending the saveframe that has text up to pos
+or None when there is none. The text at pos should be white space following
+a token.
+"""
+def save_end_find( text, pos ):
+    if isinstance( text, str ):
+        pattern = pattern_save_end_skip
+    else:
+        pattern = pattern_save_end_skip_bytes
+    for match in pattern.finditer( text, pos ):
+        if match.lastgroup == 'save_end':
+            return match.start()
+    return None
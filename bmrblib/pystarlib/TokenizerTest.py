@@ -0,0 +1,90 @@
+from unittest import TestCase
+import unittest
+from bmrblib.pystarlib.Tokenizer import tokenize
+from bmrblib.pystarlib.Tokenizer import TOKEN_DATA
+from bmrblib.pystarlib.Tokenizer import TOKEN_SAVE_BEGIN
+from bmrblib.pystarlib.Tokenizer import TOKEN_SAVE_END
+from bmrblib.pystarlib.Tokenizer import TOKEN_LOOP
+from bmrblib.pystarlib.Tokenizer import TOKEN_STOP
+from bmrblib.pystarlib.Tokenizer import TOKEN_TAG
+from bmrblib.pystarlib.Tokenizer import TOKEN_VALUE
+from bmrblib.pystarlib.Tokenizer import TOKEN_VALUES
+from bmrblib.pystarlib.Tokenizer import TOKEN_ERROR
+
+
+class AllChecks(TestCase):
+    def testtokenize(self):
+        """tokenize"""
+        text = """data_test
+# comment
+save_sf_1
+   _A.a  'it''s' # comment
+   _A.b  H5'
+   loop_
+      _B.a
+      _B.b
+"a b" x#y
+;
+block # no comment
+;
+'H5" x'
+   stop_
+save_
+"""
+        tokensExpected = [
+            (TOKEN_DATA,        'data_test'),
+            (TOKEN_SAVE_BEGIN,  'save_sf_1'),
+            (TOKEN_TAG,         '_A.a'),
+            (TOKEN_VALUE,       "it''s"),
+            (TOKEN_TAG,         '_A.b'),
+            (TOKEN_VALUE,       "H5'"),
+            (TOKEN_LOOP,        'loop_'),
+            (TOKEN_TAG,         '_B.a'),
+            (TOKEN_TAG,         '_B.b'),
+            (TOKEN_VALUE,       'a b'),
+            (TOKEN_VALUE,       'x#y'),
+            (TOKEN_VALUE,       '\nblock # no comment\n'),
+            (TOKEN_VALUE,       'H5" x'),
+            (TOKEN_STOP,        'stop_'),
+            (TOKEN_SAVE_END,    'save_'),
+            ]
+        self.assertEqual( list( tokenize( text )), tokensExpected)
+        self.assertEqual( list( tokenize( text.replace('\n', '\r\n') )), tokensExpected)
+        self.assertEqual( list( tokenize( text.replace('\n', '\r') )), tokensExpected)
+
+    def testtokenize_runs(self):
+        """tokenize runs of unquoted values"""
+        text = """data_test
+loop_
+   _B.a
+   _B.b
+1 a#b
+loop_x stop_1 # comment
+'q v' save_x_y
+stop_
+save_
+"""
+        tokensExpected = [
+            (TOKEN_DATA,        'data_test'),
+            (TOKEN_LOOP,        'loop_'),
+            (TOKEN_TAG,         '_B.a'),
+            (TOKEN_TAG,         '_B.b'),
+            (TOKEN_VALUES,      '1 a#b\nloop_x stop_1'),
+            (TOKEN_VALUE,       'q v'),
+            (TOKEN_SAVE_BEGIN,  'save_x_y'),
+            (TOKEN_STOP,        'stop_'),
+            (TOKEN_SAVE_END,    'save_'),
+            ]
+        self.assertEqual( list( tokenize( text, runs = True )), tokensExpected)
+        self.assertEqual( list( tokenize( text.encode(), runs = True )), tokensExpected)
+        self.assertEqual( [ token for token in tokenize( text ) if token[0] == TOKEN_VALUE ],
+            [ (TOKEN_VALUE, value) for value in ('1', 'a#b', 'loop_x', 'stop_1', 'q v') ])
+
+    def testtokenize_error(self):
+        """tokenize unmatched quote"""
+        tokens = list( tokenize( "data_test\n_A.a 'open\n" ))
+        self.assertEqual( tokens[-1][0], TOKEN_ERROR)
+
+
+if __name__ == "__main__":
+    unittest.main()
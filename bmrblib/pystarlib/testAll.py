@@ -7,9 +7,13 @@ python testAll.py
 if __name__ == "__main__":
     modList = ( 
                "TextTest", 
+               "TokenizerTest", 
                "UtilsTest", 
+               "ColumnTest", 
                "TagTableTest", 
                "SaveFrameTest", 
+               "SaveFrameIndexTest", 
+               "ParseCacheTest", 
                "FileTest", 
                )
     # Next line is to fool pydev extensions into thinking suite is defined in the regular way.
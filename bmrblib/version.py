@@ -20,7 +20,7 @@
 #############################################################################
 
 # Module docstring.
-"""The NMR-STAR version singleton object.
+"""The NMR-STAR version object.
 
 This file is part of the U{BMRB library<https://gna.org/projects/bmrblib>}.
 """
@@ -30,20 +30,28 @@ from re import search
 
 
 class Star_version(object):
-    """A singleton for storing the NMR-STAR version information."""
+    """An object for storing the NMR-STAR version information.
 
-    # Class variable for storing the class instance.
-    instance = None
+    Each NMR_STAR object holds its own instance, which is passed on to its saveframe objects, so that files of different versions can be handled at the same time.
+    """
 
-    def __new__(self, *args, **kargs):
-        """Replacement function for implementing the singleton design pattern."""
+    def __init__(self, version=None):
+        """Initialise the object, setting the version number if given.
 
-        # First initialisation.
-        if self.instance is None:
-            self.instance = object.__new__(self, *args, **kargs)
+        @keyword version:   The NMR-STAR version number.
+        @type version:      None or str
+        """
+
+        # Init.
+        self.version = None
+        self.major = None
+        self.minor = None
+        self.revision = None
+        self.sub_revision = None
 
-        # Already initialised, so return the instance.
-        return self.instance
+        # Set the version.
+        if version:
+            self.set_version(version)
 
 
     def set_version(self, version):